@@ -1,7 +1,22 @@
 #!/usr/bin/env python3
 """ a script that calculates the derivative of a polynomial"""
+Polynomial = __import__('polynomial').Polynomial
 
 
 def poly_derivative(poly):
     """ a function that calculates the derivative of a polynomial"""
-    
+    if isinstance(poly, Polynomial):
+        return poly.derivative()
+    if type(poly) is not list or len(poly) < 1:
+        return None
+    for coefficient in poly:
+        if type(coefficient) is not int and type(coefficient) is not float:
+            return None
+    if len(poly) == 1:
+        return [0]
+    derivative = [power * coefficient
+                  for power, coefficient in enumerate(poly)][1:]
+    # trailing zeros carry no degree, as in Polynomial
+    while len(derivative) > 1 and derivative[-1] == 0:
+        derivative.pop()
+    return derivative
@@ -1,11 +1,15 @@
 #!/usr/bin/env python3
 """ defines a function that calculates the integral of a polynomial """
+Polynomial = __import__('polynomial').Polynomial
 
 
 def poly_integral(poly, C=0):
     """
     calculates the integral of the given polynomial
+    (a Polynomial gives a Polynomial, computed in O(n) by NumPy)
     """
+    if isinstance(poly, Polynomial):
+        return poly.integral(C)
     if type(poly) is not list or len(poly) < 1:
         return None
     if type(C) is not int and type(C) is not float:
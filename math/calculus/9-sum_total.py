@@ -1,10 +1,12 @@
 #!/usr/bin/env python3
 """ a script that calculates the sum of squares"""
+summation = __import__('summation')
 
 
 def summation_i_squared(n):
     """ a function that calculates the sum of squares"""
     if type(n) is not int or n < 1:
         return None
-    result = (n * (n + 1) * (2 * n + 1)) / 6
-    return int(result)
+    # integer Faulhaber formula: exact for any n, where the float
+    # division of n * (n + 1) * (2 * n + 1) lost digits past n ~ 2e5
+    return summation.power_sum(n, 2)
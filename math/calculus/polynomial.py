@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+""" defines a polynomial type with vectorized evaluation """
+import numpy as np
+
+# below this many coefficients in the shorter factor, np.convolve beats
+# the three FFTs of a product
+FFT_THRESHOLD = 64
+
+# integer products go through the FFT only while the largest possible
+# coefficient times the FFT rounding growth (log2 of its size) stays
+# below this, so that rounding back to integers is exact
+FFT_EXACT_BOUND = 2 ** 50
+
+
+def _magnitude(coef):
+    """
+    largest absolute value of integer coefficients, as a Python int
+    """
+    return max(abs(int(coef.max())), abs(int(coef.min())))
+
+
+class Polynomial:
+    """
+    polynomial with its coefficients in a NumPy array, the index of a
+    coefficient being its power (as in the list functions)
+    """
+    __slots__ = ('coef',)
+
+    def __init__(self, coef):
+        """
+        creates the polynomial sum(coef[i] * x ** i)
+        """
+        coef = np.atleast_1d(np.asarray(coef))
+        if coef.ndim != 1 or coef.size == 0:
+            raise ValueError("coef must be a non-empty 1-D sequence")
+        # trailing zeros carry no degree
+        nonzero = np.flatnonzero(coef)
+        self.coef = coef[:nonzero[-1] + 1 if nonzero.size else 1]
+
+    @property
+    def degree(self):
+        """
+        degree of the polynomial (0 for a constant)
+        """
+        return len(self.coef) - 1
+
+    def tolist(self):
+        """
+        coefficients as a list, in the format of the list functions
+        """
+        return self.coef.tolist()
+
+    def __call__(self, x):
+        """
+        evaluates the polynomial at x (scalar or array) with Horner's
+        scheme: one multiply-add pass over x per coefficient, in place
+        """
+        x = np.asarray(x)
+        result = np.full(x.shape, self.coef[-1],
+                         dtype=np.result_type(x, self.coef))
+        for coefficient in self.coef[-2::-1]:
+            result *= x
+            result += coefficient
+        return result[()]
+
+    def derivative(self):
+        """
+        derivative of the polynomial, in O(n)
+        """
+        if self.degree == 0:
+            return Polynomial([0])
+        return Polynomial(self.coef[1:] * np.arange(1, len(self.coef)))
+
+    def integral(self, C=0):
+        """
+        antiderivative of the polynomial with constant C, in O(n)
+        """
+        return Polynomial(np.concatenate((
+            [C], self.coef / np.arange(1, len(self.coef) + 1))))
+
+    def _coef(self, other):
+        """
+        coefficients of other, a Polynomial or a number
+        """
+        if isinstance(other, Polynomial):
+            return other.coef
+        return np.atleast_1d(np.asarray(other))
+
+    def __add__(self, other):
+        """
+        sum of two polynomials, or of a polynomial and a number
+        """
+        a, b = self.coef, self._coef(other)
+        if len(a) < len(b):
+            a, b = b, a
+        result = a.astype(np.result_type(a, b), copy=True)
+        result[:len(b)] += b
+        return Polynomial(result)
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        """
+        opposite of the polynomial
+        """
+        return Polynomial(-self.coef)
+
+    def __sub__(self, other):
+        """
+        difference of two polynomials
+        """
+        return self + -Polynomial(self._coef(other))
+
+    def __rsub__(self, other):
+        """
+        difference of a number and a polynomial
+        """
+        return -self + other
+
+    def __mul__(self, other):
+        """
+        product of two polynomials: direct convolution for short
+        factors, FFT (O(n log n)) once both have FFT_THRESHOLD or more
+        coefficients, except for integer factors whose product could
+        exceed FFT_EXACT_BOUND
+        """
+        a, b = self.coef, self._coef(other)
+        if min(len(a), len(b)) < FFT_THRESHOLD:
+            return Polynomial(np.convolve(a, b))
+
+        size = len(a) + len(b) - 1
+        n = 1 << (size - 1).bit_length()
+        integers = a.dtype.kind in 'iu' and b.dtype.kind in 'iu'
+        if integers and min(len(a), len(b)) * _magnitude(a) \
+                * _magnitude(b) * n.bit_length() >= FFT_EXACT_BOUND:
+            return Polynomial(np.convolve(a, b))
+        if np.iscomplexobj(a) or np.iscomplexobj(b):
+            product = np.fft.ifft(np.fft.fft(a, n) * np.fft.fft(b, n))
+        else:
+            product = np.fft.irfft(np.fft.rfft(a, n) * np.fft.rfft(b, n), n)
+        product = product[:size]
+        if integers:
+            product = np.rint(product).astype(np.result_type(a, b))
+        return Polynomial(product)
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other):
+        """
+        same coefficients
+        """
+        return isinstance(other, Polynomial) \
+            and np.array_equal(self.coef, other.coef)
+
+    def __repr__(self):
+        """
+        Polynomial([c0, c1, ...])
+        """
+        return "Polynomial({})".format(self.tolist())
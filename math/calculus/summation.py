@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+""" defines closed forms of sums and products over i = 1..n """
+from fractions import Fraction
+from functools import lru_cache
+from math import comb, factorial, lcm, lgamma
+import numpy as np
+
+# Bernoulli numbers B_0, B_1, ... (B_1 = -1/2), extended on demand
+BERNOULLI = [Fraction(1)]
+
+# counts from which log(n!) is taken from Stirling's series, below from
+# a table
+STIRLING_MIN = 256
+LOG_FACTORIALS = np.array([lgamma(k + 1) for k in range(STIRLING_MIN + 1)])
+
+
+def bernoulli(m):
+    """
+    returns the Bernoulli number B_m as a Fraction (B_1 = -1/2),
+    every B_j up to m being computed once and kept in BERNOULLI
+    """
+    for j in range(len(BERNOULLI), m + 1):
+        BERNOULLI.append(-sum(comb(j + 1, k) * BERNOULLI[k]
+                              for k in range(j)) / (j + 1))
+    return BERNOULLI[m]
+
+
+@lru_cache(maxsize=None)
+def faulhaber(p):
+    """
+    returns the coefficients (numerators, denominator) of Faulhaber's
+    formula: sum(i ** p for i in 1..n) = sum(num[k] * n ** k) // den,
+    k = 0..p+1, in integers
+    """
+    coef = [Fraction(0)] * (p + 2)
+    for j in range(p + 1):
+        # B_1 = +1/2 for sums starting at i = 1
+        b = -bernoulli(j) if j == 1 else bernoulli(j)
+        coef[p + 1 - j] = comb(p + 1, j) * b / (p + 1)
+    den = lcm(*(c.denominator for c in coef))
+    return tuple(int(c * den) for c in coef), den
+
+
+def _horner(coef, n):
+    """
+    evaluates sum(coef[k] * n ** k) for a number or an array n
+    """
+    result = coef[-1]
+    for c in coef[-2::-1]:
+        result = result * n + c
+    return result
+
+
+def _narrow(result):
+    """
+    converts an object array of integers to int64 when they all fit
+    """
+    if result.size and all(-2 ** 63 <= v < 2 ** 63 for v in result.flat):
+        return result.astype(np.int64)
+    return result
+
+
+def power_sum(n, p=1, exact=True):
+    """
+    sum(i ** p for i in 1..n) in O(p) operations, for an integer n or
+    an array of n (0 for n < 1)
+
+    exact=True computes in Python integers, exact for any n (arrays
+    come back as int64 when every sum fits, else as objects);
+    exact=False evaluates in float64 at C speed
+    """
+    num, den = faulhaber(p)
+    if np.ndim(n) == 0 and not isinstance(n, np.ndarray):
+        if n < 1:
+            return 0
+        if exact:
+            return _horner(num, int(n)) // den
+        return _horner(num, float(n)) / den
+
+    values = np.asarray(n)
+    if not exact:
+        values = values.astype(np.float64)
+        result = _horner(np.array(num, dtype=np.float64) / den, values)
+        return np.where(values < 1, 0., result)[()]
+
+    if values.size:
+        top = max(abs(int(values.min())), abs(int(values.max())))
+        if sum(abs(c) * top ** k for k, c in enumerate(num)) < 2 ** 63:
+            # no intermediate overflows int64: exact at C speed
+            values = values.astype(np.int64)
+            return np.where(values < 1, 0, _horner(num, values) // den)[()]
+    values = values.astype(object)
+    result = np.where(values < 1, 0, _horner(num, values) // den)
+    return _narrow(result.astype(object))[()]
+
+
+def polynomial_sum(coef, n, exact=True):
+    """
+    sum(P(i) for i in 1..n) for the polynomial P(i) = sum(coef[k] * i ** k)
+    (integer coefficients for exact sums), as a combination of power
+    sums
+    """
+    total = 0
+    for p, c in enumerate(coef):
+        if c:
+            total = total + c * power_sum(n, p, exact)
+    return total
+
+
+def power_product(n, p=1):
+    """
+    product(i ** p for i in 1..n) = n! ** p, exact, for an integer n
+    """
+    return factorial(max(int(n), 0)) ** p
+
+
+def _stirling(n):
+    """
+    log(n!) = lgamma(n + 1) from Stirling's series, exact to rounding
+    for n >= STIRLING_MIN
+    """
+    z = n + 1
+    w = 1 / (z * z)
+    series = (1 / 12 - w * (1 / 360 - w / 1260)) / z
+    return (z - 0.5) * np.log(z) - z + np.log(2 * np.pi) / 2 + series
+
+
+def log_power_product(n, p=1):
+    """
+    log(product(i ** p for i in 1..n)) = p * log(n!), for an integer n
+    or an array of n, without overflow and without a Python loop over n
+    """
+    n = np.maximum(np.asarray(n, dtype=np.float64), 0)
+    small = np.minimum(n, STIRLING_MIN).astype(np.int64)
+    log_fact = np.where(n < STIRLING_MIN, LOG_FACTORIALS[small], _stirling(n))
+    return (p * log_fact)[()]
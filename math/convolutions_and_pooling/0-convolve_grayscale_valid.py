@@ -4,36 +4,26 @@
 """
 
 import numpy as np
+convolve_engine = __import__('convolve_engine')
 
 
-def convolve_grayscale_valid(images, kernel):
+def convolve_grayscale_valid(images, kernel, dtype=None,
+                             separable_tol=1e-6):
     """
         Function that performs a valid convolution on grayscale images
 
         :param images: ndarray, shape(m, h, w), multiple grayscale images
         :param kernel: ndarray, shape(kh,kw), kernel for convolution
+        :param dtype: None (float64), 'float32' or 'mixed' (float16
+        storage, float32 accumulation)
+        :param separable_tol: float, relative error under which a low-rank
+        kernel (Gaussian, box, Sobel) runs as 1-D passes, None to disable
 
         :return: ndarray containing convolved images
     """
-    # size images and kernel
-    m, h, w = images.shape
-    kh, kw = kernel.shape
+    # grayscale: one channel in, one kernel out
+    convolved_images = convolve_engine.convolve(
+        images[..., np.newaxis], kernel[..., np.newaxis, np.newaxis],
+        padding='valid', dtype=dtype, separable_tol=separable_tol)
 
-    # output size
-    output_height = h - kh + 1
-    output_width = w - kw + 1
-
-    # initialize output
-    convolved_images = np.zeros((m, output_height, output_width))
-
-    # convolution
-    for i in range(output_height):
-        for j in range(output_width):
-            # extract region from each image
-            image_zone = images[:, i:i+kh, j:j+kw]
-
-            # element wize multiplication
-            convolved_images[:, i, j] = np.sum(image_zone * kernel,
-                                               axis=(1, 2))
-
-    return convolved_images
+    return convolved_images[..., 0]
@@ -4,45 +4,35 @@
 """
 
 import numpy as np
+convolve_engine = __import__('convolve_engine')
 
 
-def convolve_grayscale_same(images, kernel):
+def convolve_grayscale_same(images, kernel, dtype=None, separable_tol=1e-6):
     """
         Function that performs a same convolution on grayscale images
 
         :param images: ndarray, shape(m, h, w), multiple grayscale images
         :param kernel: ndarray, shape(kh,kw), kernel for convolution
+        :param dtype: None (float64), 'float32' or 'mixed' (float16
+        storage, float32 accumulation)
+        :param separable_tol: float, relative error under which a low-rank
+        kernel (Gaussian, box, Sobel) runs as 1-D passes, None to disable
 
         :return: ndarray containing convolved images
     """
     # size images and kernel
-    m, h, w = images.shape
+    _, h, w = images.shape
     kh, kw = kernel.shape
 
-    # output size
-    output_height = h
-    output_width = w
-
-    # initialize output
-    convolved_images = np.zeros((m, output_height, output_width))
-
     # calcul padding (size odd or even)
     padding_width = int(kw / 2)
     padding_height = int(kh / 2)
 
-    # add zero padding to the input images
-    image_pad = np.pad(images,
-                       ((0, 0), (padding_height, padding_height),
-                        (padding_width, padding_width)), mode='constant')
-
-    # convolution
-    for i in range(output_height):
-        for j in range(output_width):
-            # extract region from each image
-            image_zone = image_pad[:, i:i+kh, j:j+kw]
-
-            # element wize multiplication
-            convolved_images[:, i, j] = np.sum(image_zone * kernel,
-                                               axis=(1, 2))
+    # grayscale: one channel in, one kernel out
+    convolved_images = convolve_engine.convolve(
+        images[..., np.newaxis], kernel[..., np.newaxis, np.newaxis],
+        padding=(padding_height, padding_width), dtype=dtype,
+        separable_tol=separable_tol)
 
-    return convolved_images
+    # even kernels give one extra row/column: keep output size (h, w)
+    return convolved_images[:, :h, :w, 0]
@@ -4,9 +4,11 @@
 """
 
 import numpy as np
+convolve_engine = __import__('convolve_engine')
 
 
-def convolve_channels(images, kernel, padding='same', stride=(1, 1)):
+def convolve_channels(images, kernel, padding='same', stride=(1, 1),
+                      dtype=None, separable_tol=1e-6):
     """
         Function that performs a convolution on images with channels
 
@@ -14,46 +16,16 @@ def convolve_channels(images, kernel, padding='same', stride=(1, 1)):
         :param kernel: ndarray, shape(kh,kw, c), kernel for convolution
         :param padding: tuple (ph,pw) or 'same" or "valid'
         :param stride: tuple (sh, sw)
+        :param dtype: None (float64), 'float32' or 'mixed' (float16
+        storage, float32 accumulation)
+        :param separable_tol: float, relative error under which a low-rank
+        kernel (Gaussian, box, Sobel) runs as 1-D passes, None to disable
 
         :return: ndarray containing convolved images
     """
-    # size images, kernel, padding, stride
-    m, h, w, c = images.shape
-    kh, kw, _ = kernel.shape
-    sh, sw = stride
+    # one kernel out
+    convolved_images = convolve_engine.convolve(
+        images, kernel[..., np.newaxis], padding=padding, stride=stride,
+        dtype=dtype, separable_tol=separable_tol)
 
-    # output size and padding
-    if padding == 'valid':
-        # no padding
-        ph, pw = 0, 0
-    elif padding == 'same':
-        ph = int((((h - 1) * sh + kh - h) / 2) + 1)
-        pw = int((((w - 1) * sw + kw - w) / 2) + 1)
-
-    elif isinstance(padding, tuple):
-        ph, pw = padding
-
-    # generalize output calcul
-    output_height = int((h - kh + 2 * ph) / sh + 1)
-    output_width = int((w - kw + 2 * pw) / sw + 1)
-
-    # initialize output
-    convolved_images = np.zeros((m, output_height, output_width))
-
-    # pad image
-    image_pad = np.pad(images,
-                       ((0, 0), (ph, ph),
-                        (pw, pw), (0, 0)), mode='constant')
-
-    # convolution
-    for i in range(output_height):
-        for j in range(output_width):
-            # extract region from each image
-            image_zone = image_pad[:, i * sh:i * sh + kh,
-                                   j * sw:j * sw + kw, :]
-
-            # element wize multiplication
-            convolved_images[:, i, j] = np.sum(image_zone * kernel,
-                                               axis=(1, 2, 3))
-
-    return convolved_images
+    return convolved_images[..., 0]
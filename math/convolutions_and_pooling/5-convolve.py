@@ -3,10 +3,12 @@
     Multiple Kernels
 """
 
-import numpy as np
+convolve_engine = __import__('convolve_engine')
 
 
-def convolve(images, kernel, padding='same', stride=(1, 1)):
+def convolve(images, kernel, padding='same', stride=(1, 1), tile_bytes=None,
+             workers=None, axis='m', dtype=None, out=None, workspace=None,
+             separable_tol=1e-6):
     """
         Function that performs a convolution on images using multiple kernel
 
@@ -14,48 +16,35 @@ def convolve(images, kernel, padding='same', stride=(1, 1)):
         :param kernel: ndarray, shape(kh,kw,c,nc), kernel for convolution
         :param padding: tuple (ph,pw) or 'same" or "valid'
         :param stride: tuple (sh, sw)
+        :param tile_bytes: int, if set convolve tile by tile within this
+        memory budget (images may then be an np.memmap)
+        :param workers: int, if set split the work across a thread pool
+        :param axis: 'm' (batch) or 'nc' (kernels), axis split by workers
+        :param dtype: None (float64), 'float32' or 'mixed' (float16
+        storage, float32 accumulation)
+        :param separable_tol: float, relative error under which a low-rank
+        kernel (Gaussian, box, Sobel) runs as 1-D passes, None to disable
+        :param out: ndarray, shape(m, output_height, output_width, nc),
+        written in place if given
+        :param workspace: convolve_engine.Workspace, padded and scratch
+        buffers reused across calls (streaming inference)
 
         :return: ndarray containing convolved images
     """
-    # size images, kernel, padding, stride
-    m, h, w, c = images.shape
-    kh, kw, _, nc = kernel.shape
-    sh, sw = stride
-
-    # output size and padding
-    if padding == 'valid':
-        # no padding
-        ph, pw = 0, 0
-    elif padding == 'same':
-        ph = int((((h - 1) * sh + kh - h) / 2) + 1)
-        pw = int((((w - 1) * sw + kw - w) / 2) + 1)
-
-    elif isinstance(padding, tuple):
-        ph, pw = padding
-
-    # generalize output calcul
-    output_height = int((h - kh + 2 * ph) / sh + 1)
-    output_width = int((w - kw + 2 * pw) / sw + 1)
-
-    # initialize output
-    convolved_images = np.zeros((m, output_height, output_width, nc))
-
-    # pad image
-    image_pad = np.pad(images,
-                       ((0, 0), (ph, ph),
-                        (pw, pw), (0, 0)), mode='constant')
-
-    # convolution
-    for k in range(nc):
-        for i in range(output_height):
-            for j in range(output_width):
-                # extract region from each image
-                image_zone = image_pad[:, i * sh:i * sh + kh,
-                                       j * sw:j * sw + kw, :]
-
-                # element wize multiplication
-                convolved_images[:, i, j, k] = np.sum(image_zone
-                                                      * kernel[:, :, :, k],
-                                                      axis=(1, 2, 3))
-
-    return convolved_images
+    if tile_bytes is not None:
+        # out-of-core: halo-overlapped tiles, no full padded copy
+        return convolve_engine.convolve_tiled(
+            images, kernel, padding=padding, stride=stride,
+            out=out, tile_bytes=tile_bytes, dtype=dtype)
+
+    if workers is not None:
+        # same chunks whatever the number of workers: deterministic
+        return convolve_engine.convolve_parallel(
+            images, kernel, padding=padding, stride=stride,
+            workers=workers, axis=axis, dtype=dtype, out=out)
+
+    # separable path for low-rank kernels, otherwise backend (direct,
+    # im2col or FFT) picked from the calibration table
+    return convolve_engine.convolve(
+        images, kernel, padding=padding, stride=stride, dtype=dtype,
+        out=out, workspace=workspace, separable_tol=separable_tol)
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+
+import time
+import numpy as np
+convolve = __import__('5-convolve').convolve
+
+np.random.seed(0)
+images = np.random.rand(32, 64, 64, 3)
+kernel = np.random.rand(3, 3, 3, 16)
+
+reference = convolve(images, kernel, padding='same', stride=(1, 1))
+for dtype in [None, 'float32', 'mixed']:
+    start = time.perf_counter()
+    for _ in range(5):
+        output = convolve(images, kernel, padding='same', stride=(1, 1),
+                          dtype=dtype)
+    elapsed = (time.perf_counter() - start) / 5
+    error = np.max(np.abs(output - reference) / np.abs(reference).max())
+    print('{:8} {:8} {:.2e} rel. error  {:6.1f} ms  {:5.1f} MB'.format(
+        str(dtype), str(output.dtype), error, elapsed * 1000,
+        output.nbytes / 2 ** 20))
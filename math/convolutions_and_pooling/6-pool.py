@@ -4,18 +4,31 @@
 """
 
 import numpy as np
+convolve_engine = __import__('convolve_engine')
 
 
-def pool(images, kernel_shape, stride, mode='max'):
+def pool(images, kernel_shape, stride, mode='max', p=2,
+         return_indices=False, dtype=None, out=None):
     """
             Function that performs pooling on images
 
         :param images: ndarray, shape(m, h, w, c), multiple images
         :param kernel_shape: ndarray, shape(kh,kw), kernel shape for pooling
-        :param stride: tuple (sh, sw)
-        :param mode: type of pooling 'max' or 'avg'
+        :param stride: tuple (sh, sw), may be smaller than the kernel
+        (overlapping pooling)
+        :param mode: type of pooling 'max', 'min', 'avg' or 'lp'
+        :param p: order of the 'lp' pooling, (sum |x|^p)^(1/p)
+        :param return_indices: bool, also return the position of the
+        selected value inside each window
+        :param dtype: None (float64), 'float32' or 'mixed' (float16
+        storage, float32 accumulation)
+        :param out: ndarray, shape(m, output_height, output_width, c),
+        written in place if given
 
-        :return: ndarray containing pooled images
+        :return: ndarray containing pooled images, and if return_indices
+        an int32 ndarray shape(m, output_height, output_width, c) of
+        flat indices (row * kw + col) of the max ('min' for argmin)
+        inside each window, None for 'avg' and 'lp'
 
     """
     # size images, kernel, padding, stride
@@ -27,16 +40,42 @@ def pool(images, kernel_shape, stride, mode='max'):
     output_height = int((h - kh) / sh + 1)
     output_width = int((w - kw) / sw + 1)
 
-    # initialize output
-    pooled_images = np.zeros((m, output_height, output_width, c))
-
-    for i in range(output_height):
-        for j in range(output_width):
-            image_zone = images[:, i * sh:i * sh + kh,
-                                j * sw:j * sw + kw, :]
-            if mode == 'max':
-                pooled_images[:, i, j, :] = np.max(image_zone, axis=(1, 2))
-            elif mode == 'avg':
-                pooled_images[:, i, j, :] = np.average(image_zone, axis=(1, 2))
+    storage, accumulation = convolve_engine.resolve_dtype(dtype)
+    images = np.asarray(images, dtype=storage)
+
+    # view (m, output_height, output_width, kh, kw, c), no copy
+    windows = convolve_engine.sliding_windows(images, (kh, kw), (sh, sw),
+                                              (output_height, output_width))
+    indices = None
+
+    if out is None:
+        pooled_images = np.empty((m, output_height, output_width, c),
+                                 dtype=storage)
+    else:
+        pooled_images = out
+
+    # reductions write straight into the output
+    if mode == 'max':
+        np.max(windows, axis=(3, 4), out=pooled_images)
+    elif mode == 'min':
+        np.min(windows, axis=(3, 4), out=pooled_images)
+    elif mode == 'avg':
+        np.mean(windows, axis=(3, 4), dtype=accumulation, out=pooled_images)
+    elif mode == 'lp':
+        pooled_images[...] = np.sum(np.abs(windows.astype(accumulation)) ** p,
+                                    axis=(3, 4)) ** (1 / p)
+    else:
+        pooled_images.fill(0)
+
+    if return_indices and mode in ('max', 'min'):
+        # flatten (kh, kw) to a single axis to get one index per window
+        flat = windows.reshape(m, output_height, output_width, kh * kw, c)
+        if mode == 'max':
+            indices = np.argmax(flat, axis=3).astype(np.int32)
+        else:
+            indices = np.argmin(flat, axis=3).astype(np.int32)
+
+    if return_indices:
+        return pooled_images, indices
 
     return pooled_images
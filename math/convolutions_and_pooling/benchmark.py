@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+    Benchmark of the convolution and pooling kernels
+
+    Sweeps batch size, spatial size, kernel size, stride and padding,
+    reports images/s, GFLOP/s and peak memory, stores the results as
+    JSON and flags regressions against a previous run:
+
+        ./benchmark.py -o new.json --compare old.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CNN = os.path.join(HERE, '..', '..', 'supervised_learning', 'cnn')
+sys.path[:0] = [HERE, CNN]
+
+convolve = __import__('5-convolve').convolve
+pool = __import__('6-pool').pool
+conv_forward = __import__('0-conv_forward').conv_forward
+pool_forward = __import__('1-pool_forward').pool_forward
+conv_backward = __import__('2-conv_backward').conv_backward
+pool_backward = __import__('3-pool_backward').pool_backward
+
+CHANNELS = 3
+KERNELS = 8
+
+
+def make_case(name, m, size, k, stride, padding):
+    """
+        Function that builds the inputs and the call of one benchmark case
+
+        :param name: str, kernel benchmarked
+        :param m: int, batch size
+        :param size: int, height and width of the images
+        :param k: int, kernel height and width
+        :param stride: int, stride along both axes
+        :param padding: 'same' or 'valid'
+
+        :return: tuple (function without argument, function giving the
+        flop count from the output of the first one)
+    """
+    images = np.random.rand(m, size, size, CHANNELS)
+    kernel = np.random.rand(k, k, CHANNELS, KERNELS)
+    b = np.random.rand(1, 1, 1, KERNELS)
+    strides = (stride, stride)
+
+    # multiply-add per kernel tap for convolutions, one op for pooling
+    def conv_flop(output):
+        """ flop of a convolution producing output """
+        return 2 * output.size * k * k * CHANNELS
+
+    def pool_flop(output):
+        """ flop of a pooling producing output """
+        return output.size * k * k
+
+    if name == 'convolve':
+        return (lambda: convolve(images, kernel, padding, strides),
+                conv_flop)
+    if name == 'conv_forward':
+        return (lambda: conv_forward(images, kernel, b, np.tanh, padding,
+                                     strides), conv_flop)
+    if name == 'conv_backward':
+        dZ = np.random.rand(*conv_forward(images, kernel, b, np.tanh,
+                                          padding, strides).shape)
+        return (lambda: conv_backward(dZ, images, kernel, b, padding,
+                                      strides),
+                lambda _: 2 * conv_flop(dZ))
+    if name == 'pool':
+        return (lambda: pool(images, (k, k), strides), pool_flop)
+    if name == 'pool_forward':
+        return (lambda: pool_forward(images, (k, k), strides), pool_flop)
+    if name == 'pool_backward':
+        dA = np.random.rand(*pool_forward(images, (k, k), strides).shape)
+        return (lambda: pool_backward(dA, images, (k, k), strides),
+                lambda _: pool_flop(dA))
+    raise ValueError("unknown kernel {}".format(name))
+
+
+def measure(function, repeat):
+    """
+        Function that times a call and records its peak memory
+
+        :param function: callable without argument
+        :param repeat: int, number of timed runs (best one is kept)
+
+        :return: tuple (seconds, peak bytes, output of the call)
+    """
+    # warm-up, and peak memory (NumPy allocations are traced)
+    tracemalloc.start()
+    output = function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+
+    return best, peak, output
+
+
+def run(kernels, batches, sizes, kernel_sizes, strides, paddings, repeat):
+    """
+        Function that runs the sweep
+
+        :param kernels: list of kernel names
+        :param batches: list of batch sizes
+        :param sizes: list of spatial sizes
+        :param kernel_sizes: list of kernel sizes
+        :param strides: list of strides
+        :param paddings: list of paddings
+        :param repeat: int, timed runs per case
+
+        :return: list of result dicts
+    """
+    results = []
+    for name in kernels:
+        # pooling has no padding
+        pads = ['valid'] if 'pool' in name else paddings
+        grid = itertools.product(batches, sizes, kernel_sizes, strides, pads)
+        for m, size, k, stride, padding in grid:
+            if k > size:
+                continue
+            function, flop = make_case(name, m, size, k, stride, padding)
+            seconds, peak, output = measure(function, repeat)
+            result = {'kernel': name, 'batch': m, 'size': size, 'k': k,
+                      'stride': stride, 'padding': padding,
+                      'seconds': seconds,
+                      'images_per_s': m / seconds,
+                      'gflops': flop(output) / seconds / 1e9,
+                      'peak_mb': peak / 2 ** 20}
+            results.append(result)
+            print('{kernel:14} m={batch:<4} {size:>4}px k={k:<2} '
+                  's={stride} {padding:5}  {images_per_s:10.1f} img/s  '
+                  '{gflops:7.2f} GFLOP/s  {peak_mb:8.1f} MB'.format(**result))
+
+    return results
+
+
+def case_key(result):
+    """
+        Function that identifies a case across runs
+
+        :param result: dict, one benchmark result
+
+        :return: tuple
+    """
+    return (result['kernel'], result['batch'], result['size'], result['k'],
+            result['stride'], result['padding'])
+
+
+def compare(results, baseline, threshold):
+    """
+        Function that flags cases slower than a previous run
+
+        :param results: list of result dicts of this run
+        :param baseline: list of result dicts of the previous run
+        :param threshold: float, relative throughput drop flagged
+
+        :return: list of (key, old images/s, new images/s)
+    """
+    old = {case_key(r): r['images_per_s'] for r in baseline}
+    regressions = []
+    for result in results:
+        key = case_key(result)
+        if key in old and result['images_per_s'] < old[key] * (1 - threshold):
+            regressions.append((key, old[key], result['images_per_s']))
+
+    return regressions
+
+
+def main(argv=None):
+    """
+        Function that parses the command line, runs and stores the sweep
+
+        :param argv: list of arguments, default sys.argv[1:]
+
+        :return: int, exit status (1 if a regression is flagged)
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip(),
+                                     formatter_class=argparse.
+                                     RawDescriptionHelpFormatter)
+    parser.add_argument('--kernels', nargs='+',
+                        default=['convolve', 'pool', 'conv_forward',
+                                 'pool_forward', 'conv_backward',
+                                 'pool_backward'])
+    parser.add_argument('--batch', nargs='+', type=int, default=[8, 32])
+    parser.add_argument('--size', nargs='+', type=int, default=[28, 64])
+    parser.add_argument('--kernel-size', nargs='+', type=int,
+                        default=[3, 5])
+    parser.add_argument('--stride', nargs='+', type=int, default=[1, 2])
+    parser.add_argument('--padding', nargs='+', default=['same', 'valid'])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('-o', '--output', default='benchmark.json')
+    parser.add_argument('--compare', help='previous JSON results')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='relative throughput drop flagged')
+    args = parser.parse_args(argv)
+
+    np.random.seed(0)
+    results = run(args.kernels, args.batch, args.size, args.kernel_size,
+                  args.stride, args.padding, args.repeat)
+
+    with open(args.output, 'w') as f:
+        json.dump({'numpy': np.__version__,
+                   'python': platform.python_version(),
+                   'machine': platform.machine(),
+                   'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                   'results': results}, f, indent=2)
+    print('results written to {}'.format(args.output))
+
+    if args.compare is None:
+        return 0
+
+    with open(args.compare) as f:
+        baseline = json.load(f)['results']
+    regressions = compare(results, baseline, args.threshold)
+    for key, old, new in regressions:
+        print('REGRESSION {}: {:.1f} -> {:.1f} img/s ({:+.0%})'.format(
+            key, old, new, new / old - 1))
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,921 @@
+#!/usr/bin/env python3
+"""
+    Convolution engine (direct, im2col and FFT backends)
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+
+# measured backend per problem size, persisted between runs
+CALIBRATION_FILE = os.environ.get(
+    'CONVOLVE_CALIBRATION',
+    os.path.join(os.path.expanduser('~'), '.cache',
+                 'convolve_calibration.json'))
+ALGORITHMS = ('direct', 'im2col', 'fft')
+# relative Frobenius error accepted when a kernel is run as a sum of
+# separable (rank-1) terms
+SEPARABLE_TOL = 1e-6
+# default memory budget of one tile of convolve_tiled
+TILE_BYTES = 64 * 2 ** 20
+# fixed number of work chunks of convolve_parallel: the split does not
+# depend on the number of workers, so neither do the results
+PARALLEL_CHUNKS = 16
+_calibration = None
+
+# resolve_dtype, sliding_windows and Workspace have a twin in
+# supervised_learning/cnn/cnn_engine.py: every project is
+# self-contained, keep both in step
+
+
+def resolve_dtype(dtype=None):
+    """
+        Function that resolves a precision policy
+
+        :param dtype: None (float64), 'float32', 'float16' or 'mixed'
+        (float16 storage, float32 accumulation), or a numpy float dtype
+
+        :return: tuple (storage dtype, accumulation dtype)
+    """
+    if dtype is None:
+        dtype = np.float64
+    elif isinstance(dtype, str) and dtype == 'mixed':
+        dtype = np.float16
+    storage = np.dtype(dtype)
+
+    # never accumulate below float32
+    return storage, np.promote_types(storage, np.float32)
+
+
+def padding_size(h, w, kh, kw, padding, stride):
+    """
+        Function that computes the padding used by the convolution tasks
+
+        :param h: int, height of the images
+        :param w: int, width of the images
+        :param kh: int, height of the kernel
+        :param kw: int, width of the kernel
+        :param padding: tuple (ph,pw) or 'same' or 'valid'
+        :param stride: tuple (sh, sw)
+
+        :return: tuple (ph, pw)
+    """
+    sh, sw = stride
+
+    if padding == 'valid':
+        # no padding
+        return 0, 0
+    if padding == 'same':
+        ph = int((((h - 1) * sh + kh - h) / 2) + 1)
+        pw = int((((w - 1) * sw + kw - w) / 2) + 1)
+        return ph, pw
+
+    ph, pw = padding
+    return ph, pw
+
+
+def sliding_windows(images_pad, kernel_shape, stride, output_shape):
+    """
+        Function that builds a read-only view of every kernel window
+
+        :param images_pad: ndarray, shape(m, h, w, c), padded images
+        :param kernel_shape: tuple (kh, kw)
+        :param stride: tuple (sh, sw)
+        :param output_shape: tuple (output_height, output_width)
+
+        :return: ndarray view, shape(m, output_height, output_width, kh, kw, c)
+    """
+    m, _, _, c = images_pad.shape
+    kh, kw = kernel_shape
+    sh, sw = stride
+    output_height, output_width = output_shape
+    s_m, s_h, s_w, s_c = images_pad.strides
+
+    # no copy: each window shares memory with images_pad
+    return np.lib.stride_tricks.as_strided(
+        images_pad,
+        shape=(m, output_height, output_width, kh, kw, c),
+        strides=(s_m, s_h * sh, s_w * sw, s_h, s_w, s_c),
+        writeable=False)
+
+
+class Workspace:
+    """
+        Class Workspace : scratch buffers reused across calls, keyed by
+        name, shape and dtype (not thread-safe, use one per thread)
+    """
+
+    def __init__(self):
+        """
+            class constructor
+        """
+        self.buffers = {}
+
+    def buffer(self, name, shape, dtype=np.float64):
+        """
+            Function that returns a cached buffer, zero-filled on creation
+
+            :param name: str, role of the buffer
+            :param shape: tuple, shape of the buffer
+            :param dtype: dtype of the buffer
+
+            :return: ndarray
+        """
+        key = (name, tuple(shape), np.dtype(dtype).str)
+        if key not in self.buffers:
+            self.buffers[key] = np.zeros(shape, dtype=dtype)
+        return self.buffers[key]
+
+    def padded(self, images, ph, pw, dtype=np.float64):
+        """
+            Function that copies images into a cached zero-bordered buffer,
+            replacing np.pad
+
+            :param images: ndarray, shape(m, h, w, c), multiple images
+            :param ph: int, padding height
+            :param pw: int, padding width
+            :param dtype: dtype of the buffer
+
+            :return: ndarray, shape(m, h + 2 * ph, w + 2 * pw, c)
+        """
+        m, h, w, c = images.shape
+        image_pad = self.buffer('pad', (m, h + 2 * ph, w + 2 * pw, c), dtype)
+
+        # the border is zeroed on creation and never written
+        image_pad[:, ph:ph + h, pw:pw + w] = images
+
+        return image_pad
+
+    def clear(self):
+        """
+            Function that releases every buffer
+        """
+        self.buffers.clear()
+
+
+def _prepare(images, kernel, padding, stride, storage=np.float64,
+             workspace=None):
+    """
+        Function that pads the images and computes the output size
+
+        :param images: ndarray, shape(m, h, w, c), multiple images
+        :param kernel: ndarray, shape(kh,kw,c,nc), kernel for convolution
+        :param padding: tuple (ph,pw) or 'same' or 'valid'
+        :param stride: tuple (sh, sw)
+        :param storage: dtype of the padded images
+        :param workspace: Workspace, reuse its padded buffer if given
+
+        :return: padded images, (output_height, output_width)
+    """
+    # size images, kernel, padding, stride
+    _, h, w, _ = images.shape
+    kh, kw, _, _ = kernel.shape
+    sh, sw = stride
+    ph, pw = padding_size(h, w, kh, kw, padding, stride)
+
+    # generalize output calcul
+    output_height = int((h - kh + 2 * ph) / sh + 1)
+    output_width = int((w - kw + 2 * pw) / sw + 1)
+
+    if workspace is not None:
+        image_pad = workspace.padded(images, ph, pw, storage)
+    elif ph == 0 and pw == 0:
+        image_pad = np.asarray(images, dtype=storage)
+    else:
+        # pad image, in the storage precision
+        image_pad = np.pad(np.asarray(images, dtype=storage),
+                           ((0, 0), (ph, ph),
+                            (pw, pw), (0, 0)), mode='constant')
+
+    return image_pad, (output_height, output_width)
+
+
+def _output(out, shape, storage):
+    """
+        Function that checks or allocates the output buffer
+
+        :param out: ndarray or None, caller-provided output
+        :param shape: tuple, expected shape
+        :param storage: dtype of a freshly allocated output, that a
+        caller-provided one must hold without changing kind (no float
+        results truncated into integers)
+
+        :return: ndarray
+    """
+    if out is None:
+        return np.empty(shape, dtype=storage)
+    if out.shape != tuple(shape):
+        raise ValueError("out must have shape {}".format(tuple(shape)))
+    if not np.can_cast(storage, out.dtype, casting='same_kind'):
+        raise ValueError("out must have a dtype that holds {} values, "
+                         "not {}".format(np.dtype(storage), out.dtype))
+    return out
+
+
+def _valid_range(size, k, p, s, output_size):
+    """
+        Function that computes, for one kernel offset, the output
+        positions whose input falls inside the image (not in the padding)
+
+        :param size: int, image size along the axis
+        :param k: int, kernel offset along the axis
+        :param p: int, padding along the axis
+        :param s: int, stride along the axis
+        :param output_size: int, output size along the axis
+
+        :return: tuple (first output, end output, first input)
+    """
+    # output o reads input o * s + k - p, which must be in [0, size)
+    o0 = max(0, -(-(p - k) // s))
+    o1 = min(output_size, (size - 1 + p - k) // s + 1)
+
+    return o0, max(o0, o1), o0 * s + k - p
+
+
+def convolve_direct(images, kernel, padding='same', stride=(1, 1),
+                    dtype=None, out=None, workspace=None):
+    """
+        Function that performs a convolution by accumulating one
+        (c, nc) product per kernel offset, O(h*w*kh*kw)
+
+        Borders are handled with virtual padding: each offset only
+        touches the output positions whose input lies inside the image,
+        so no padded copy is ever made.
+
+        :param images: ndarray, shape(m, h, w, c), multiple images
+        :param kernel: ndarray, shape(kh,kw,c,nc), kernel for convolution
+        :param padding: tuple (ph,pw) or 'same' or 'valid'
+        :param stride: tuple (sh, sw)
+        :param dtype: precision policy, see resolve_dtype
+        :param out: ndarray, shape(m, output_height, output_width, nc),
+        written in place if given
+        :param workspace: Workspace, holds the accumulator when out
+        cannot
+
+        :return: ndarray, shape(m, output_height, output_width, nc)
+    """
+    m, h, w, _ = images.shape
+    kh, kw, _, nc = kernel.shape
+    sh, sw = stride
+    ph, pw = padding_size(h, w, kh, kw, padding, stride)
+    storage, accumulation = resolve_dtype(dtype)
+    kernel = np.asarray(kernel, dtype=accumulation)
+    images = np.asarray(images, dtype=storage)
+
+    # generalize output calcul
+    output_height = int((h - kh + 2 * ph) / sh + 1)
+    output_width = int((w - kw + 2 * pw) / sw + 1)
+    shape = (m, output_height, output_width, nc)
+    out = _output(out, shape, storage)
+
+    # accumulate in out itself when it has the accumulation precision
+    if out.dtype == accumulation:
+        convolved_images = out
+        convolved_images.fill(0)
+    elif workspace is not None:
+        convolved_images = workspace.buffer('acc', shape, accumulation)
+        convolved_images.fill(0)
+    else:
+        convolved_images = np.zeros(shape, dtype=accumulation)
+
+    for i in range(kh):
+        i0, i1, r0 = _valid_range(h, i, ph, sh, output_height)
+        if i0 == i1:
+            continue
+        for j in range(kw):
+            j0, j1, c0 = _valid_range(w, j, pw, sw, output_width)
+            if j0 == j1:
+                continue
+            image_zone = images[:, r0:r0 + (i1 - i0 - 1) * sh + 1:sh,
+                                c0:c0 + (j1 - j0 - 1) * sw + 1:sw, :]
+            convolved_images[:, i0:i1, j0:j1] += image_zone @ kernel[i, j]
+
+    if convolved_images is not out:
+        out[...] = convolved_images
+
+    return out
+
+
+def convolve_im2col(images, kernel, padding='same', stride=(1, 1),
+                    dtype=None, out=None, workspace=None):
+    """
+        Function that performs a convolution as one batched GEMM
+
+        :param images: ndarray, shape(m, h, w, c), multiple images
+        :param kernel: ndarray, shape(kh,kw,c,nc), kernel for convolution
+        :param padding: tuple (ph,pw) or 'same' or 'valid'
+        :param stride: tuple (sh, sw)
+        :param dtype: precision policy, see resolve_dtype
+        :param out: ndarray, shape(m, output_height, output_width, nc),
+        written in place if given
+        :param workspace: Workspace, caches the padded images and the
+        im2col matrix between calls
+
+        :return: ndarray, shape(m, output_height, output_width, nc)
+    """
+    m = images.shape[0]
+    kh, kw, c, nc = kernel.shape
+    storage, accumulation = resolve_dtype(dtype)
+    kernel = np.asarray(kernel, dtype=accumulation)
+    image_pad, output_shape = _prepare(images, kernel, padding, stride,
+                                       storage, workspace)
+    shape = (m,) + output_shape + (nc,)
+
+    windows = sliding_windows(image_pad, (kh, kw), stride, output_shape)
+
+    if workspace is None:
+        # im2col: (m*oh*ow, kh*kw*c) @ (kh*kw*c, nc)
+        convolved_images = np.tensordot(windows, kernel, axes=3)
+        if out is None:
+            return convolved_images.astype(storage, copy=False)
+        out = _output(out, shape, storage)
+        out[...] = convolved_images
+        return out
+
+    # same GEMM, im2col matrix and product written in cached buffers
+    rows = m * output_shape[0] * output_shape[1]
+    columns = workspace.buffer('im2col', (rows, kh * kw * c), accumulation)
+    columns.reshape(windows.shape)[...] = windows
+    out = _output(out, shape, storage)
+    if out.dtype == accumulation and out.flags.c_contiguous:
+        np.matmul(columns, kernel.reshape(-1, nc), out=out.reshape(rows, nc))
+    else:
+        product = workspace.buffer('product', (rows, nc), accumulation)
+        np.matmul(columns, kernel.reshape(-1, nc), out=product)
+        out[...] = product.reshape(shape)
+
+    return out
+
+
+def convolve_fft(images, kernel, padding='same', stride=(1, 1),
+                 dtype=None, out=None, workspace=None):
+    """
+        Function that performs a convolution in the frequency domain,
+        O(h*w*log(h*w)) whatever the kernel size
+
+        :param images: ndarray, shape(m, h, w, c), multiple images
+        :param kernel: ndarray, shape(kh,kw,c,nc), kernel for convolution
+        :param padding: tuple (ph,pw) or 'same' or 'valid'
+        :param stride: tuple (sh, sw)
+        :param dtype: precision policy, see resolve_dtype
+        :param out: ndarray, shape(m, output_height, output_width, nc),
+        written in place if given
+        :param workspace: Workspace, caches the padded images
+
+        :return: ndarray, shape(m, output_height, output_width, nc)
+    """
+    kh, kw, _, _ = kernel.shape
+    sh, sw = stride
+    storage, accumulation = resolve_dtype(dtype)
+    kernel = np.asarray(kernel, dtype=accumulation)
+    image_pad, (output_height, output_width) = _prepare(images, kernel,
+                                                        padding, stride,
+                                                        storage, workspace)
+    _, hp, wp, _ = image_pad.shape
+
+    # the tasks compute a cross-correlation: flip the kernel so the
+    # product of spectra gives it; hp x wp is enough as only the
+    # valid (non circular) part is kept
+    fft_shape = (hp, wp)
+    image_spectrum = np.fft.rfft2(image_pad.astype(accumulation, copy=False),
+                                  s=fft_shape, axes=(1, 2))
+    kernel_spectrum = np.fft.rfft2(kernel[::-1, ::-1], s=fft_shape,
+                                   axes=(0, 1))
+
+    # sum over input channels while still in the frequency domain
+    spectrum = np.einsum('mhwc,hwcn->mhwn', image_spectrum, kernel_spectrum)
+    full = np.fft.irfft2(spectrum, s=fft_shape, axes=(1, 2))
+
+    # valid part, then stride
+    convolved_images = full[:, kh - 1:kh - 1 + (output_height - 1) * sh + 1:sh,
+                            kw - 1:kw - 1 + (output_width - 1) * sw + 1:sw]
+    if out is None:
+        return convolved_images.astype(storage)
+    out = _output(out, convolved_images.shape, storage)
+    out[...] = convolved_images
+
+    return out
+
+
+def separable_factors(kernel, tol=SEPARABLE_TOL):
+    """
+        Function that decomposes each (kh, kw) slice of a kernel into
+        a sum of rank-1 (column x row) terms with an SVD
+
+        :param kernel: ndarray, shape(kh,kw,c,nc), kernel for convolution
+        :param tol: float, largest relative error of the truncation
+
+        :return: tuple (u, v) of shapes (r,kh,c,nc) and (r,kw,c,nc),
+        with r the smallest rank meeting tol for every slice
+    """
+    # batched SVD of the (c, nc) slices, each (kh, kw)
+    slices = np.moveaxis(np.asarray(kernel, dtype=np.float64), (0, 1),
+                         (2, 3))
+    U, S, Vt = np.linalg.svd(slices, full_matrices=False)
+
+    # tail[..., r]: error left when only the first r terms are kept
+    tail = np.sqrt(np.cumsum(S[..., ::-1] ** 2, axis=-1)[..., ::-1])
+    norm = tail[..., :1]
+    kept = np.sum(tail > tol * norm, axis=-1)
+    rank = max(int(np.max(kept)), 1)
+
+    # split each singular value evenly between both factors
+    root = np.sqrt(S[..., :rank])
+    u = U[..., :rank] * root[..., np.newaxis, :]
+    v = Vt[..., :rank, :] * root[..., np.newaxis]
+
+    return (np.moveaxis(u, (3, 2), (0, 1)), np.moveaxis(v, (2, 3), (0, 1)))
+
+
+def convolve_separable(images, kernel, padding='same', stride=(1, 1),
+                       dtype=None, out=None, workspace=None,
+                       tol=SEPARABLE_TOL):
+    """
+        Function that performs a convolution as a vertical then a
+        horizontal 1-D pass per rank-1 term of the kernel, so
+        O(r*(kh+kw)) instead of O(kh*kw) per pixel
+
+        :param images: ndarray, shape(m, h, w, c), multiple images
+        :param kernel: ndarray, shape(kh,kw,c,nc), kernel for convolution
+        :param padding: tuple (ph,pw) or 'same' or 'valid'
+        :param stride: tuple (sh, sw)
+        :param dtype: precision policy, see resolve_dtype
+        :param out: ndarray, shape(m, output_height, output_width, nc),
+        written in place if given
+        :param workspace: Workspace, caches the padded images
+        :param tol: float, largest relative error of the low-rank kernel
+
+        :return: ndarray, shape(m, output_height, output_width, nc)
+    """
+    kh, kw, _, _ = kernel.shape
+    sh, sw = stride
+    storage, accumulation = resolve_dtype(dtype)
+    u, v = separable_factors(kernel, tol)
+    u = u.astype(accumulation)
+    v = v.astype(accumulation)
+    image_pad, (output_height, output_width) = _prepare(images, kernel,
+                                                        padding, stride,
+                                                        storage, workspace)
+    image_pad = image_pad[..., np.newaxis]
+    span_h = (output_height - 1) * sh + 1
+    span_w = (output_width - 1) * sw + 1
+
+    convolved_images = 0
+    for r in range(u.shape[0]):
+        # vertical pass: (m, output_height, padded width, c, nc)
+        columns = 0
+        for i in range(kh):
+            columns = columns + image_pad[:, i:i + span_h:sh] * u[r, i]
+
+        # horizontal pass, then sum over the input channels
+        rows = 0
+        for j in range(kw):
+            rows = rows + columns[:, :, j:j + span_w:sw] * v[r, j]
+        convolved_images = convolved_images + np.sum(rows, axis=3)
+
+    if out is None:
+        return convolved_images.astype(storage, copy=False)
+    out = _output(out, convolved_images.shape, storage)
+    out[...] = convolved_images
+
+    return out
+
+
+def is_separable(kernel, tol=SEPARABLE_TOL):
+    """
+        Function that tells whether the separable path is cheaper than
+        the direct one for a kernel
+
+        Only single-channel kernels qualify: with c*nc > 1 the separable
+        passes broadcast to (m, oh, w, c, nc) element-wise products and
+        lose to the single GEMM of the other paths, whatever the rank
+
+        :param kernel: ndarray, shape(kh,kw,c,nc), kernel for convolution
+        :param tol: float, largest relative error of the low-rank kernel
+
+        :return: bool
+    """
+    kh, kw, c, nc = kernel.shape
+    if kh == 1 or kw == 1 or c * nc != 1:
+        return False
+    u, _ = separable_factors(kernel, tol)
+
+    return u.shape[0] * (kh + kw) < kh * kw
+
+
+def _bucket(n):
+    """
+        Function that rounds a size up to the next power of two
+
+        :param n: int, size
+
+        :return: int, bucket of the size
+    """
+    return 1 << max(int(n) - 1, 0).bit_length()
+
+
+def _calibration_key(image_shape, kernel_shape, stride):
+    """
+        Function that builds the calibration table key of a problem
+
+        :param image_shape: tuple (h, w, c)
+        :param kernel_shape: tuple (kh, kw, c, nc)
+        :param stride: tuple (sh, sw)
+
+        :return: str, key
+    """
+    h, w, c = image_shape
+    kh, kw, _, nc = kernel_shape
+    sh, sw = stride
+    return '{}x{}x{}:{}x{}x{}:{}x{}'.format(_bucket(h), _bucket(w),
+                                            _bucket(c), kh, kw, _bucket(nc),
+                                            sh, sw)
+
+
+def load_calibration(path=None):
+    """
+        Function that loads the calibration table
+
+        :param path: str, file of the table, default CALIBRATION_FILE
+
+        :return: dict, key -> algorithm
+    """
+    global _calibration
+
+    try:
+        with open(path or CALIBRATION_FILE) as f:
+            _calibration = json.load(f)
+    except (OSError, ValueError):
+        _calibration = {}
+
+    return _calibration
+
+
+def save_calibration(path=None):
+    """
+        Function that persists the calibration table
+
+        :param path: str, file of the table, default CALIBRATION_FILE
+
+        :return: True if the table was written, False otherwise
+    """
+    path = path or CALIBRATION_FILE
+
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(_calibration or {}, f, indent=2, sort_keys=True)
+    except OSError:
+        # read-only home: keep the table in memory only
+        return False
+
+    return True
+
+
+def calibrate(image_shape, kernel_shape, stride=(1, 1), repeat=3):
+    """
+        Function that times every backend on a problem size and records
+        the fastest one in the calibration table
+
+        :param image_shape: tuple (h, w, c)
+        :param kernel_shape: tuple (kh, kw, c, nc)
+        :param stride: tuple (sh, sw)
+        :param repeat: int, number of timed runs per backend
+
+        :return: str, fastest algorithm
+    """
+    if _calibration is None:
+        load_calibration()
+
+    h, w, c = image_shape
+    kh, kw, _, nc = kernel_shape
+
+    # one image of the bucketed size is representative of the batch;
+    # private generator, the caller's random stream is left untouched
+    rng = np.random.default_rng(0)
+    images = rng.random((1, _bucket(h), _bucket(w), _bucket(c)))
+    kernel = rng.random((kh, kw, _bucket(c), _bucket(nc)))
+
+    timings = {}
+    for algorithm in ALGORITHMS:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            BACKENDS[algorithm](images, kernel, 'valid', stride)
+            best = min(best, time.perf_counter() - start)
+        timings[algorithm] = best
+
+    fastest = min(timings, key=timings.get)
+    _calibration[_calibration_key(image_shape, kernel_shape,
+                                  stride)] = fastest
+    save_calibration()
+
+    return fastest
+
+
+def select_algorithm(image_shape, kernel_shape, stride=(1, 1),
+                     measure=None):
+    """
+        Function that picks the convolution backend of a problem
+
+        :param image_shape: tuple (h, w, c)
+        :param kernel_shape: tuple (kh, kw, c, nc)
+        :param stride: tuple (sh, sw)
+        :param measure: bool, calibrate unseen sizes instead of guessing;
+        None does so only when CONVOLVE_CALIBRATION is set, so that no
+        benchmark runs and nothing is written to the home directory
+        unasked
+
+        :return: str, 'direct', 'im2col' or 'fft'
+    """
+    if _calibration is None:
+        load_calibration()
+
+    key = _calibration_key(image_shape, kernel_shape, stride)
+    if key in _calibration:
+        return _calibration[key]
+    if measure is None:
+        measure = 'CONVOLVE_CALIBRATION' in os.environ
+    if measure:
+        return calibrate(image_shape, kernel_shape, stride)
+
+    # heuristic: FFT computes every position, so strides waste it;
+    # large kernels amortize the transforms
+    kh, kw, _, _ = kernel_shape
+    if stride == (1, 1) and kh * kw >= 49:
+        return 'fft'
+    if kh * kw <= 9:
+        return 'direct'
+    return 'im2col'
+
+
+def convolve(images, kernel, padding='same', stride=(1, 1),
+             algorithm='auto', dtype=None, out=None, workspace=None,
+             separable_tol=SEPARABLE_TOL):
+    """
+        Function that performs a convolution with the given backend
+
+        :param images: ndarray, shape(m, h, w, c), multiple images
+        :param kernel: ndarray, shape(kh,kw,c,nc), kernel for convolution
+        :param padding: tuple (ph,pw) or 'same' or 'valid'
+        :param stride: tuple (sh, sw)
+        :param algorithm: 'auto', 'direct', 'im2col', 'fft' or 'separable'
+        :param dtype: precision policy, see resolve_dtype
+        :param out: ndarray, shape(m, output_height, output_width, nc),
+        written in place if given
+        :param workspace: Workspace, scratch buffers reused across calls
+        :param separable_tol: float, relative error under which 'auto'
+        runs a low-rank kernel as 1-D passes, None to never do so
+
+        :return: ndarray, shape(m, output_height, output_width, nc)
+    """
+    if algorithm == 'separable' or (
+            algorithm == 'auto' and separable_tol is not None
+            and is_separable(kernel, separable_tol)):
+        return convolve_separable(images, kernel, padding, stride, dtype,
+                                  out=out, workspace=workspace,
+                                  tol=separable_tol or SEPARABLE_TOL)
+
+    if algorithm == 'auto':
+        algorithm = select_algorithm(images.shape[1:], kernel.shape,
+                                     tuple(stride))
+
+    return BACKENDS[algorithm](images, kernel, padding, stride, dtype,
+                               out=out, workspace=workspace)
+
+
+def tile_shape(kernel_shape, stride=(1, 1), tile_bytes=TILE_BYTES,
+               itemsize=8):
+    """
+        Function that computes the largest square output tile whose
+        working set (input tile with halo, window matrix and output)
+        fits in a memory budget
+
+        :param kernel_shape: tuple (kh, kw, c, nc)
+        :param stride: tuple (sh, sw)
+        :param tile_bytes: int, memory budget of one tile
+        :param itemsize: int, bytes per element
+
+        :return: tuple (tile_height, tile_width) in output pixels
+    """
+    kh, kw, c, nc = kernel_shape
+    sh, sw = stride
+
+    # bytes per output pixel: its input footprint, its im2col row
+    # (worst backend) and its output vector
+    per_pixel = itemsize * (sh * sw * c + kh * kw * c + nc)
+    side = max(int((tile_bytes / per_pixel) ** 0.5), 1)
+
+    return side, side
+
+
+def convolve_tiled(images, kernel, padding='same', stride=(1, 1),
+                   out=None, tile_bytes=TILE_BYTES, algorithm='direct',
+                   dtype=None):
+    """
+        Function that performs a convolution tile by tile, so images
+        and output can be np.memmap arrays larger than the RAM: only one
+        halo-overlapped tile is in memory at a time and the padding is
+        never materialized for the whole batch
+
+        :param images: ndarray or np.memmap, shape(m, h, w, c)
+        :param kernel: ndarray, shape(kh,kw,c,nc), kernel for convolution
+        :param padding: tuple (ph,pw) or 'same' or 'valid'
+        :param stride: tuple (sh, sw)
+        :param out: ndarray or np.memmap, shape(m, output_height,
+        output_width, nc), written in place, allocated if None
+        :param tile_bytes: int, memory budget of one tile
+        :param algorithm: backend used on each tile
+        :param dtype: precision policy, see resolve_dtype
+
+        :return: out
+    """
+    # size images, kernel, padding, stride
+    m, h, w, c = images.shape
+    kh, kw, _, nc = kernel.shape
+    sh, sw = stride
+    ph, pw = padding_size(h, w, kh, kw, padding, stride)
+
+    # generalize output calcul
+    output_height = int((h - kh + 2 * ph) / sh + 1)
+    output_width = int((w - kw + 2 * pw) / sw + 1)
+
+    storage, _ = resolve_dtype(dtype)
+    # checked before the first tile is computed
+    out = _output(out, (m, output_height, output_width, nc), storage)
+
+    tile_height, tile_width = tile_shape(kernel.shape, stride, tile_bytes,
+                                         np.dtype(out.dtype).itemsize)
+    backend = BACKENDS[algorithm]
+
+    for n in range(m):
+        for i0 in range(0, output_height, tile_height):
+            i1 = min(i0 + tile_height, output_height)
+            for j0 in range(0, output_width, tile_width):
+                j1 = min(j0 + tile_width, output_width)
+
+                # padded rows/columns read by this tile (with halo)
+                r0, r1 = i0 * sh, (i1 - 1) * sh + kh
+                c0, c1 = j0 * sw, (j1 - 1) * sw + kw
+
+                # part of the tile inside the image, the rest is padding
+                y0, y1 = max(r0 - ph, 0), min(r1 - ph, h)
+                x0, x1 = max(c0 - pw, 0), min(c1 - pw, w)
+
+                tile = np.zeros((1, r1 - r0, c1 - c0, c), dtype=storage)
+                if y0 < y1 and x0 < x1:
+                    tile[0, y0 + ph - r0:y1 + ph - r0,
+                         x0 + pw - c0:x1 + pw - c0] = images[n, y0:y1,
+                                                             x0:x1]
+
+                out[n:n + 1, i0:i1, j0:j1] = backend(tile, kernel,
+                                                     'valid', stride, dtype)
+
+    if isinstance(out, np.memmap):
+        out.flush()
+
+    return out
+
+
+def _convolve_chunk(image_pad, kernel, stride, axis, chunk, algorithm,
+                    dtype=None):
+    """
+        Function that convolves one chunk of the batch or of the kernels
+
+        :param image_pad: ndarray, shape(m, h, w, c), padded images
+        :param kernel: ndarray, shape(kh,kw,c,nc), kernel for convolution
+        :param stride: tuple (sh, sw)
+        :param axis: 'm' to split images, 'nc' to split kernels
+        :param chunk: slice of the split axis
+        :param algorithm: backend used on the chunk
+        :param dtype: precision policy, see resolve_dtype
+
+        :return: ndarray, convolved chunk
+    """
+    backend = BACKENDS[algorithm]
+    if axis == 'm':
+        return backend(image_pad[chunk], kernel, 'valid', stride, dtype)
+    return backend(image_pad, kernel[..., chunk], 'valid', stride, dtype)
+
+
+def _convolve_shared_chunk(shared, kernel, stride, axis, chunk, algorithm,
+                           dtype=None):
+    """
+        Function run by a worker process: attaches the shared padded
+        images and output buffers and fills its chunk of the output
+
+        :param shared: tuple (input name, input shape, output name,
+        output shape) of the shared memory blocks
+        :param kernel: ndarray, shape(kh,kw,c,nc), kernel for convolution
+        :param stride: tuple (sh, sw)
+        :param axis: 'm' to split images, 'nc' to split kernels
+        :param chunk: slice of the split axis
+        :param algorithm: backend used on the chunk
+        :param dtype: precision policy, see resolve_dtype
+    """
+    storage, _ = resolve_dtype(dtype)
+    in_name, in_shape, out_name, out_shape = shared
+    in_shm = shared_memory.SharedMemory(name=in_name)
+    out_shm = shared_memory.SharedMemory(name=out_name)
+
+    try:
+        image_pad = np.ndarray(in_shape, dtype=storage, buffer=in_shm.buf)
+        out = np.ndarray(out_shape, dtype=storage, buffer=out_shm.buf)
+        result = _convolve_chunk(image_pad, kernel, stride, axis, chunk,
+                                 algorithm, dtype)
+        if axis == 'm':
+            out[chunk] = result
+        else:
+            out[..., chunk] = result
+        del image_pad, out
+    finally:
+        in_shm.close()
+        out_shm.close()
+
+
+def convolve_parallel(images, kernel, padding='same', stride=(1, 1),
+                      workers=None, axis='m', executor='thread',
+                      algorithm='im2col', dtype=None, out=None):
+    """
+        Function that performs a convolution split across workers along
+        the batch (m) or output-channel (nc) axis
+
+        Threads share the arrays (NumPy releases the GIL in BLAS);
+        processes share the padded images and the output through
+        shared memory. The axis is always cut in the same chunks, so
+        the result does not depend on the number of workers.
+
+        :param images: ndarray, shape(m, h, w, c), multiple images
+        :param kernel: ndarray, shape(kh,kw,c,nc), kernel for convolution
+        :param padding: tuple (ph,pw) or 'same' or 'valid'
+        :param stride: tuple (sh, sw)
+        :param workers: int, number of workers, default os.cpu_count()
+        :param axis: 'm' to split images, 'nc' to split kernels
+        :param executor: 'thread' or 'process'
+        :param algorithm: backend used on each chunk
+        :param dtype: precision policy, see resolve_dtype
+        :param out: ndarray, shape(m, output_height, output_width, nc),
+        written in place if given
+
+        :return: ndarray, shape(m, output_height, output_width, nc)
+    """
+    storage, _ = resolve_dtype(dtype)
+    image_pad, (output_height, output_width) = _prepare(images, kernel,
+                                                        padding, stride,
+                                                        storage)
+    m = image_pad.shape[0]
+    nc = kernel.shape[3]
+    out_shape = (m, output_height, output_width, nc)
+
+    size = m if axis == 'm' else nc
+    bounds = np.linspace(0, size, min(size, PARALLEL_CHUNKS) + 1).astype(int)
+    chunks = [slice(a, b) for a, b in zip(bounds[:-1], bounds[1:])]
+
+    if executor == 'thread':
+        out = _output(out, out_shape, storage)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(lambda chunk: _convolve_chunk(
+                image_pad, kernel, stride, axis, chunk, algorithm, dtype),
+                chunks)
+            for chunk, result in zip(chunks, results):
+                if axis == 'm':
+                    out[chunk] = result
+                else:
+                    out[..., chunk] = result
+        return out
+
+    in_shm = shared_memory.SharedMemory(create=True,
+                                        size=max(image_pad.nbytes, 1))
+    out_shm = shared_memory.SharedMemory(
+        create=True, size=max(int(np.prod(out_shape)) * storage.itemsize, 1))
+
+    try:
+        np.ndarray(image_pad.shape, dtype=storage,
+                   buffer=in_shm.buf)[:] = image_pad
+        shared = (in_shm.name, image_pad.shape, out_shm.name, out_shape)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_convolve_shared_chunk, shared, kernel,
+                                   stride, axis, chunk, algorithm, dtype)
+                       for chunk in chunks]
+            for future in futures:
+                future.result()
+        result = np.ndarray(out_shape, dtype=storage, buffer=out_shm.buf)
+        out = _output(out, out_shape, storage)
+        out[...] = result
+        del result
+    finally:
+        in_shm.close()
+        in_shm.unlink()
+        out_shm.close()
+        out_shm.unlink()
+
+    return out
+
+
+BACKENDS = {'direct': convolve_direct,
+            'im2col': convolve_im2col,
+            'fft': convolve_fft,
+            'separable': convolve_separable}
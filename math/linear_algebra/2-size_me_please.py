@@ -1,9 +1,13 @@
 #!/usr/bin/env python3
 """ A script that calculates the shape of a matrix """
+Matrix = __import__('matrix').Matrix
 
 
 def matrix_shape(matrix):
     """ A function  that calculates the shape of a matrix"""
+    if isinstance(matrix, Matrix):
+        return list(matrix.shape)
+
     matrix_shape = []
     while (type(matrix) is list):
         matrix_shape.append(len(matrix))
@@ -1,9 +1,14 @@
 #!/usr/bin/env python3
 """ A script that  returns the transpose of a 2D matrix"""
+Matrix = __import__('matrix').Matrix
 
 
 def matrix_transpose(matrix):
-    """ A function that  returns the transpose of a 2D matrix"""
+    """ A function that  returns the transpose of a 2D matrix
+    (a Matrix gives a view sharing its data, no copy)"""
+    if isinstance(matrix, Matrix):
+        return matrix.T
+
     rows = len(matrix)
     cols = len(matrix[0])
 
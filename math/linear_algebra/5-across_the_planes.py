@@ -1,16 +1,23 @@
 #!/usr/bin/env python3
 """ A script that adds two matrices element-wise """
+Matrix = __import__('matrix').Matrix
+list_engine = __import__('list_engine')
 
 
 def add_matrices2D(mat1, mat2):
-    """ A function that adds two matrices element-wise """
-    if len(mat1) != len(mat2) or len(mat1[0]) != len(mat2[0]):
-        return None
+    """ A function that adds two matrices element-wise
 
-    result = []
-    for i in range(len(mat1)):
-        row = []
-        for j in range(len(mat1[0])):
-            row.append(mat1[i][j] + mat2[i][j])
-        result.append(row)
-    return result
\ No newline at end of file
+    Shapes follow the NumPy broadcasting rules, None if they do not
+    broadcast"""
+    if isinstance(mat1, Matrix) and isinstance(mat2, Matrix):
+        dims = list_engine.broadcast_shape(mat1.shape, mat2.shape)
+        if dims is None:
+            return None
+        if mat1.shape != tuple(dims):
+            mat1 = mat1.broadcast_to(*dims)
+        if mat2.shape != tuple(dims):
+            mat2 = mat2.broadcast_to(*dims)
+        return mat1 + mat2
+
+    # nested lists of any dimension, broadcast against each other
+    return list_engine.add(mat1, mat2)
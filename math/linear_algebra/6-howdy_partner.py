@@ -1,7 +1,13 @@
 #!/usr/bin/env python3
 """ A script that adds two matrices element-wise """
+list_engine = __import__('list_engine')
 
 
-def cat_arrays(arr1, arr2):
-    """A function that concatenates two arrays"""
-    return arr1 + arr2
\ No newline at end of file
+def cat_arrays(arr1, arr2, lazy=False):
+    """A function that concatenates two arrays
+
+    lazy=True returns a list_engine.ConcatView reading both arrays on
+    access instead of a new list"""
+    if lazy:
+        return list_engine.ConcatView(arr1, arr2)
+    return arr1 + arr2
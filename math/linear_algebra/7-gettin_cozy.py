@@ -1,14 +1,17 @@
 #!/usr/bin/env python3
 """Write a function that concatenates two matrices along a specific axis"""
+Matrix = __import__('matrix').Matrix
+list_engine = __import__('list_engine')
 
 
-def cat_matrices2D(mat1, mat2, axis=0):
-    """Concatenates two given matrices along a specific axis"""
-    if axis == 0 and len(mat1[0]) != len(mat2[0]) \
-            or axis == 1 and len(mat1) != len(mat2):
-        return None
+def cat_matrices2D(mat1, mat2, axis=0, lazy=False):
+    """Concatenates two given matrices along a specific axis
 
-    mat = mat1 + mat2 if axis == 0 else \
-        [mat1[i] + mat2[i] for i in range(len(mat1))]
+    Nested lists of any dimension are accepted; lazy=True returns a
+    list_engine.ConcatView instead of new lists"""
+    if isinstance(mat1, Matrix) and isinstance(mat2, Matrix):
+        if mat1.shape[1 - axis] != mat2.shape[1 - axis]:
+            return None
+        return mat1.concatenate(mat2, axis)
 
-    return mat
+    return list_engine.cat(mat1, mat2, axis, lazy)
@@ -1,13 +1,43 @@
 #!/usr/bin/env python3
 """Write a function that performs matrix multiplication"""
+from array import array
+from operator import mul
+Matrix = __import__('matrix').Matrix
 
+# rows of the transposed mat2 kept hot while every row of mat1 streams
+BLOCK = 64
+
+
+def _mat_mul_rows(rows, columns, block):
+    """Multiplies rows by columns, each given as a sequence of vectors,
+    one block of columns at a time"""
+    product = [[] for _ in rows]
+    for start in range(0, len(columns), block):
+        cols = columns[start:start + block]
+        for out, row in zip(product, rows):
+            out.extend([sum(map(mul, row, col)) for col in cols])
+
+    return product
+
+
+def mat_mul(mat1, mat2, block=BLOCK):
+    """Performs matrix multiplication with two given matrices
+
+    mat2 is transposed first, so every dot product walks two contiguous
+    rows instead of indexing mat2 column-wise. Lists of lists give a
+    list of lists, Matrix operands (flat array('d')) give a Matrix"""
+    if isinstance(mat1, Matrix) and isinstance(mat2, Matrix):
+        if mat1.cols != mat2.rows:
+            return None
+        # boxed once here rather than on every multiplication
+        rows = [mat1.row(i).tolist() for i in range(mat1.rows)]
+        columns = [mat2.column(j).tolist() for j in range(mat2.cols)]
+        data = array('d')
+        for row in _mat_mul_rows(rows, columns, block):
+            data.extend(row)
+        return Matrix(mat1.rows, mat2.cols, data)
 
-def mat_mul(mat1, mat2):
-    """Performs matrix multiplication with two given matrices"""
     if len(mat1[0]) != len(mat2):
         return None
 
-    mat = [[sum(mat1[z][j] * mat2[j][i] for j in range(len(mat1[0])))
-            for i in range(len(mat2[0]))] for z in range(len(mat1))]
-
-    return mat
+    return _mat_mul_rows(mat1, list(zip(*mat2)), block)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+    Benchmark of the pure-Python matrix multiplication
+
+    Times the original column-indexing mat_mul against the blocked,
+    transpose-first one on lists of lists and on flat Matrix operands:
+
+        ./benchmark.py --sizes 64 128 256 512 1024
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+mat_mul = __import__('8-ridin_bareback').mat_mul
+Matrix = __import__('matrix').Matrix
+
+
+def mat_mul_original(mat1, mat2):
+    """Original implementation, re-indexes mat2[j][i] column-wise"""
+    if len(mat1[0]) != len(mat2):
+        return None
+
+    mat = [[sum(mat1[z][j] * mat2[j][i] for j in range(len(mat1[0])))
+            for i in range(len(mat2[0]))] for z in range(len(mat1))]
+
+    return mat
+
+
+def best_time(function, repeat):
+    """
+        Function that times a call
+
+        :param function: callable without argument
+        :param repeat: int, number of timed runs (best one is kept)
+
+        :return: float, seconds
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def main(argv=None):
+    """
+        Function that parses the command line and runs the sweep
+
+        :param argv: list of arguments, default sys.argv[1:]
+
+        :return: int, exit status
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip(),
+                                     formatter_class=argparse.
+                                     RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=int,
+                        default=[64, 128, 256, 512, 1024])
+    parser.add_argument('--block', type=int, default=64)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--original-max', type=int, default=1024,
+                        help='largest size the original is timed at')
+    args = parser.parse_args(argv)
+
+    random.seed(0)
+    print('{:>6} {:>12} {:>12} {:>12} {:>8}'.format(
+        'n', 'original s', 'lists s', 'Matrix s', 'speedup'))
+    for n in args.sizes:
+        mat1 = [[random.random() for _ in range(n)] for _ in range(n)]
+        mat2 = [[random.random() for _ in range(n)] for _ in range(n)]
+        flat1, flat2 = Matrix.from_lists(mat1), Matrix.from_lists(mat2)
+
+        lists = best_time(lambda: mat_mul(mat1, mat2, args.block),
+                          args.repeat)
+        flat = best_time(lambda: mat_mul(flat1, flat2, args.block),
+                         args.repeat)
+        original = float('nan')
+        if n <= args.original_max:
+            original = best_time(lambda: mat_mul_original(mat1, mat2),
+                                 args.repeat)
+        print('{:6d} {:>12} {:12.3f} {:12.3f} {:>8}'.format(
+            n, '{:.3f}'.format(original) if original == original else '-',
+            lists, flat, '{:.1f}x'.format(original / min(lists, flat))
+            if original == original else '-'))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""N-dimensional operations on nested lists, with broadcasting
+
+Nested lists are walked level by level (flatten / unflatten), never
+recursively, so deep inputs cannot hit the recursion limit and each
+level is one C-speed comprehension"""
+from collections.abc import Sequence
+from itertools import chain
+from math import prod
+from operator import add as _add
+
+
+def shape(nested):
+    """Returns the shape of a nested list as a list, [] for a scalar"""
+    dims = []
+    while isinstance(nested, (list, tuple, ConcatView)):
+        dims.append(len(nested))
+        if not nested:
+            break
+        nested = nested[0]
+    return dims
+
+
+def flatten(nested, ndim):
+    """Returns the ndim first levels of nested as one flat list"""
+    if ndim == 0:
+        return [nested]
+    flat = list(nested)
+    for _ in range(ndim - 1):
+        flat = [x for sub in flat for x in sub]
+    return flat
+
+
+def unflatten(flat, dims):
+    """Returns the nested lists of the given shape holding flat"""
+    if not dims:
+        return flat[0]
+    for axis in reversed(range(1, len(dims))):
+        dim = dims[axis]
+        if dim:
+            flat = [flat[i:i + dim] for i in range(0, len(flat), dim)]
+        else:
+            flat = [[] for _ in range(prod(dims[:axis]))]
+    return flat
+
+
+def broadcast_shape(dims1, dims2):
+    """Returns the broadcast shape of two shapes, None if they do not
+    broadcast (dimensions are aligned from the last one)"""
+    ndim = max(len(dims1), len(dims2))
+    dims1 = [1] * (ndim - len(dims1)) + list(dims1)
+    dims2 = [1] * (ndim - len(dims2)) + list(dims2)
+    dims = []
+    for d1, d2 in zip(dims1, dims2):
+        if d1 != d2 and 1 not in (d1, d2):
+            return None
+        dims.append(d2 if d1 == 1 else d1)
+    return dims
+
+
+def broadcast_flat(flat, dims, target):
+    """Repeats the values of a flat list of shape dims so that it holds
+    the flat values of shape target (dims broadcasts to target)"""
+    if not prod(target):
+        return []
+    dims = [1] * (len(target) - len(dims)) + list(dims)
+    for axis in reversed(range(len(target))):
+        if dims[axis] == target[axis]:
+            continue
+        # every block of the following axes is repeated target[axis] times
+        size = prod(target[axis + 1:])
+        n = target[axis]
+        flat = [x for i in range(0, len(flat), size)
+                for x in flat[i:i + size] * n]
+    return flat
+
+
+def elementwise(op, nested1, nested2):
+    """Applies op(a, b) elementwise to two broadcastable nested lists;
+    returns None if their shapes do not broadcast"""
+    dims1, dims2 = shape(nested1), shape(nested2)
+    dims = broadcast_shape(dims1, dims2)
+    if dims is None:
+        return None
+    flat1, flat2 = flatten(nested1, len(dims1)), flatten(nested2, len(dims2))
+    if len(flat1) != prod(dims1) or len(flat2) != prod(dims2):
+        # ragged input
+        return None
+    flat1 = broadcast_flat(flat1, dims1, dims)
+    flat2 = broadcast_flat(flat2, dims2, dims)
+    return unflatten(list(map(op, flat1, flat2)), dims)
+
+
+def add(nested1, nested2):
+    """Adds two broadcastable nested lists elementwise"""
+    return elementwise(_add, nested1, nested2)
+
+
+def cat(nested1, nested2, axis=0, lazy=False):
+    """Concatenates two nested lists along axis
+
+    All the other dimensions must match (None is returned otherwise).
+    With lazy=True a ConcatView is returned: no list is built, items
+    are looked up in the inputs when accessed"""
+    dims1, dims2 = shape(nested1), shape(nested2)
+    ndim = len(dims1)
+    if axis < 0:
+        axis += ndim
+    if len(dims2) != ndim or not 0 <= axis < ndim \
+            or dims1[:axis] + dims1[axis + 1:] \
+            != dims2[:axis] + dims2[axis + 1:]:
+        return None
+
+    if lazy:
+        return ConcatView(nested1, nested2, axis)
+
+    if axis == 0:
+        return list(nested1) + list(nested2)
+
+    # lists of the concatenation axis, joined pairwise
+    lines1, lines2 = flatten(nested1, axis), flatten(nested2, axis)
+    return unflatten([list(a) + list(b) for a, b in zip(lines1, lines2)],
+                     dims1[:axis])
+
+
+class ConcatView(Sequence):
+    """Read-only concatenation of two nested sequences along an axis,
+    computed on access instead of copied"""
+    __slots__ = ('first', 'second', 'axis')
+
+    def __init__(self, first, second, axis=0):
+        """Views first and second joined along axis"""
+        self.first = first
+        self.second = second
+        self.axis = axis
+
+    def __len__(self):
+        """Length of the first axis"""
+        if self.axis == 0:
+            return len(self.first) + len(self.second)
+        return len(self.first)
+
+    def __getitem__(self, i):
+        """Item i of the first axis, itself a view below the join axis"""
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if self.axis > 0:
+            return ConcatView(self.first[i], self.second[i], self.axis - 1)
+        n = len(self.first)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("index out of range")
+        return self.first[i] if i < n else self.second[i - n]
+
+    def __iter__(self):
+        """Iterates over the first axis"""
+        if self.axis == 0:
+            return chain(self.first, self.second)
+        return (ConcatView(a, b, self.axis - 1)
+                for a, b in zip(self.first, self.second))
+
+    def tolist(self):
+        """Materializes the view as nested lists"""
+        dims = shape(self)
+        return unflatten(flatten(self, len(dims)), dims)
+
+    def __eq__(self, other):
+        """Compares the values with a nested list or another view"""
+        if isinstance(other, ConcatView):
+            other = other.tolist()
+        return self.tolist() == other
+
+    def __repr__(self):
+        """Same as the nested list it stands for"""
+        return repr(self.tolist())
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""Flat row-major matrix of doubles, for environments without NumPy"""
+from array import array
+from operator import add, sub, mul, truediv
+import sys
+
+# bytes per value of an array('d'), and its NumPy type string
+ITEMSIZE = array('d').itemsize
+TYPESTR = ('<' if sys.byteorder == 'little' else '>') + 'f8'
+
+
+class Matrix:
+    """Matrix stored in a single contiguous array('d')
+
+    A Matrix is a view (offset, shape, strides in values) on its data:
+    transpose and slicing share the data and copy nothing. The data must
+    not be resized while a view or a NumPy wrapper of it is alive"""
+    __slots__ = ('data', 'shape', 'strides', 'offset')
+
+    def __init__(self, rows, cols, data=None, strides=None, offset=0):
+        """Creates a rows x cols matrix, zero-filled if data is None,
+        or a view on data when strides and offset are given"""
+        if data is None:
+            data = array('d', bytes(ITEMSIZE * rows * cols))
+        elif not isinstance(data, array) or data.typecode != 'd':
+            data = array('d', data)
+        if strides is None:
+            strides = (cols, 1)
+            if len(data) != rows * cols:
+                raise ValueError("{} values for a {}x{} matrix".format(
+                    len(data), rows, cols))
+        self.data = data
+        self.shape = (rows, cols)
+        self.strides = tuple(strides)
+        self.offset = offset
+
+    @classmethod
+    def from_lists(cls, mat):
+        """Builds a Matrix from a list of lists"""
+        data = array('d')
+        for row in mat:
+            data.extend(row)
+        return cls(len(mat), len(mat[0]) if mat else 0, data)
+
+    @property
+    def rows(self):
+        """Number of rows"""
+        return self.shape[0]
+
+    @property
+    def cols(self):
+        """Number of columns"""
+        return self.shape[1]
+
+    def tolist(self):
+        """Returns the matrix as a list of lists"""
+        return [self.row(i).tolist() for i in range(self.rows)]
+
+    def _line(self, start, n, step):
+        """Slice of data holding n values from start every step values"""
+        return slice(start, start + n * step, step) if n else slice(0, 0)
+
+    def _row_slice(self, i):
+        """Slice of data holding row i"""
+        return self._line(self.offset + i * self.strides[0], self.cols,
+                          self.strides[1])
+
+    def row(self, i):
+        """Returns a copy of row i as an array('d')"""
+        return self.data[self._row_slice(i)]
+
+    def column(self, j):
+        """Returns a copy of column j as an array('d')"""
+        return self.data[self._line(self.offset + j * self.strides[1],
+                                    self.rows, self.strides[0])]
+
+    def is_contiguous(self):
+        """True if the values are stored row after row without gaps"""
+        rows, cols = self.shape
+        return (cols <= 1 or self.strides[1] == 1) \
+            and (rows <= 1 or self.strides[0] == cols)
+
+    def copy(self):
+        """Returns a contiguous copy"""
+        if self.is_contiguous():
+            start = self.offset
+            return Matrix(self.rows, self.cols,
+                          self.data[start:start + self.rows * self.cols])
+        data = array('d')
+        for i in range(self.rows):
+            data.extend(self.row(i))
+        return Matrix(self.rows, self.cols, data)
+
+    def broadcast_to(self, rows, cols):
+        """Returns a contiguous rows x cols copy, a dimension of 1 being
+        repeated as in NumPy broadcasting"""
+        if self.rows not in (1, rows) or self.cols not in (1, cols):
+            raise ValueError("shape {} does not broadcast to {}".format(
+                self.shape, (rows, cols)))
+        data = array('d')
+        for i in range(self.rows):
+            line = self.row(i)
+            data.extend(line if self.cols == cols else line * cols)
+        if self.rows != rows:
+            data *= rows
+        return Matrix(rows, cols, data)
+
+    def transpose(self):
+        """Returns the transposed view, no copy"""
+        return Matrix(self.cols, self.rows, self.data, self.strides[::-1],
+                      self.offset)
+
+    T = property(transpose)
+
+    def _index(self, key, axis):
+        """Normalizes an int or a slice of one axis to (start, n, step)"""
+        size = self.shape[axis]
+        if isinstance(key, slice):
+            start, stop, step = key.indices(size)
+            if step < 1:
+                raise ValueError("negative steps are not supported")
+            return start, len(range(start, stop, step)), step
+        if key < 0:
+            key += size
+        if not 0 <= key < size:
+            raise IndexError("index {} out of range".format(key))
+        return key, 1, 1
+
+    def _locate(self, key):
+        """Offset, shape and strides of m[key], and whether it is a
+        single value"""
+        if not isinstance(key, tuple):
+            key = (key, slice(None))
+        i, j = key
+        (r0, rows, rs), (c0, cols, cs) = self._index(i, 0), \
+            self._index(j, 1)
+        offset = self.offset + r0 * self.strides[0] + c0 * self.strides[1]
+        scalar = not isinstance(i, slice) and not isinstance(j, slice)
+        return offset, (rows, cols), \
+            (self.strides[0] * rs, self.strides[1] * cs), scalar
+
+    def __getitem__(self, key):
+        """m[i, j] gives a float; any slice gives a view, no copy
+        (m[i] and m[i, a:b] keep 2 dimensions)"""
+        offset, shape, strides, scalar = self._locate(key)
+        if scalar:
+            return self.data[offset]
+        return Matrix(shape[0], shape[1], self.data, strides, offset)
+
+    def __setitem__(self, key, value):
+        """Writes a number or a same-shape Matrix into m[key]"""
+        offset, shape, strides, scalar = self._locate(key)
+        if scalar:
+            self.data[offset] = value
+        else:
+            Matrix(shape[0], shape[1], self.data, strides,
+                   offset)._apply(lambda _, b: b, value)
+
+    def _apply(self, op, other):
+        """Applies op(self, other) in place, row by row at C speed;
+        other is a number or a Matrix of the same shape"""
+        if isinstance(other, Matrix):
+            if other.shape != self.shape:
+                raise ValueError("shapes {} and {} differ".format(
+                    self.shape, other.shape))
+            if other.data is self.data:
+                # may overlap with self: read it before writing
+                other = other.copy()
+        for i in range(self.rows):
+            line = self._row_slice(i)
+            if isinstance(other, Matrix):
+                values = map(op, self.data[line], other.row(i))
+            else:
+                values = map(op, self.data[line],
+                             [other] * self.cols)
+            self.data[line] = array('d', values)
+        return self
+
+    def __iadd__(self, other):
+        """In-place elementwise addition"""
+        return self._apply(add, other)
+
+    def __isub__(self, other):
+        """In-place elementwise subtraction"""
+        return self._apply(sub, other)
+
+    def __imul__(self, other):
+        """In-place elementwise multiplication"""
+        return self._apply(mul, other)
+
+    def __itruediv__(self, other):
+        """In-place elementwise division"""
+        return self._apply(truediv, other)
+
+    def __add__(self, other):
+        """Elementwise addition"""
+        return self.copy()._apply(add, other)
+
+    def __sub__(self, other):
+        """Elementwise subtraction"""
+        return self.copy()._apply(sub, other)
+
+    def __mul__(self, other):
+        """Elementwise multiplication"""
+        return self.copy()._apply(mul, other)
+
+    def __truediv__(self, other):
+        """Elementwise division"""
+        return self.copy()._apply(truediv, other)
+
+    def concatenate(self, other, axis=0):
+        """Returns a new Matrix joining self and other along axis"""
+        data = array('d')
+        if axis == 0:
+            for mat in (self, other):
+                for i in range(mat.rows):
+                    data.extend(mat.row(i))
+            return Matrix(self.rows + other.rows, self.cols, data)
+        for i in range(self.rows):
+            data.extend(self.row(i))
+            data.extend(other.row(i))
+        return Matrix(self.rows, self.cols + other.cols, data)
+
+    def memoryview(self):
+        """Returns a 2-D memoryview on the values, no copy (contiguous
+        matrices only: memoryviews cannot describe other strides)"""
+        if not self.is_contiguous():
+            raise BufferError("non-contiguous view, copy() it first")
+        n = self.rows * self.cols
+        flat = memoryview(self.data)[self.offset:self.offset + n]
+        return flat.cast('B').cast('d', self.shape)
+
+    def __buffer__(self, flags):
+        """Buffer protocol (Python 3.12+): bytes(m), memoryview(m)"""
+        return self.memoryview()
+
+    @property
+    def __array_interface__(self):
+        """Lets np.asarray(m) wrap the data in place, strides included"""
+        address, _ = self.data.buffer_info()
+        return {'version': 3, 'typestr': TYPESTR, 'shape': self.shape,
+                'strides': tuple(s * ITEMSIZE for s in self.strides),
+                'data': (address + self.offset * ITEMSIZE, False)}
+
+    def __len__(self):
+        """Number of rows"""
+        return self.rows
+
+    def __eq__(self, other):
+        """Same shape and same values"""
+        return isinstance(other, Matrix) and self.shape == other.shape \
+            and all(self.row(i) == other.row(i) for i in range(self.rows))
+
+    def __matmul__(self, other):
+        """Matrix product, see 8-ridin_bareback.mat_mul"""
+        return __import__('8-ridin_bareback').mat_mul(self, other)
+
+    def __repr__(self):
+        """Matrix([[...], ...])"""
+        return "Matrix({})".format(self.tolist())
@@ -5,6 +5,7 @@ Task 1
 
 import numpy as np
 import matplotlib.pyplot as plt
+plot_engine = __import__('plot_engine')
 
 
 def scatter():
@@ -21,6 +22,7 @@ def scatter():
     plt.xlabel('Height (in)')
     plt.ylabel('Weight (lbs)')
     plt.title("Men's Height vs Weight")
-    plt.scatter(x, y, c='magenta')
+    # drawn binned on the pixel grid beyond DECIMATE_THRESHOLD points
+    plot_engine.scatter(plt.gca(), x, y, c='magenta')
     # plt.scatter(x, y, c='m')
     plt.show()
@@ -2,6 +2,7 @@
 """ plots all 5 previous graphs in one figure """
 import numpy as np
 import matplotlib.pyplot as plt
+plot_engine = __import__('plot_engine')
 
 y0 = np.arange(0, 11) ** 3
 
@@ -29,17 +30,17 @@ student_grades = np.random.normal(68, 15, 50)
 fig = plt.figure()
 
 ax1 = fig.add_subplot(3, 2, 1)
-ax1.plot(y0, 'r-')
+plot_engine.plot(ax1, np.arange(len(y0)), y0, 'r-')
 ax1.set_xlim((0, 10))
 
 ax2 = fig.add_subplot(3, 2, 2)
-ax2.scatter(x1, y1, c='m')
+plot_engine.scatter(ax2, x1, y1, c='m')
 ax2.set_xlabel('Height (in)', fontsize='x-small')
 ax2.set_ylabel('Weight (lbs)', fontsize='x-small')
 ax2.set_title("Men's Height vs Weight", fontsize='x-small')
 
 ax3 = fig.add_subplot(3, 2, 3)
-ax3.plot(x2, y2)
+plot_engine.plot(ax3, x2, y2)
 ax3.set_xlabel('Time (years)', fontsize='x-small')
 ax3.set_ylabel('Fraction Remaining', fontsize='x-small')
 ax3.set_title("Exponential Decay of C-14", fontsize='x-small')
@@ -47,8 +48,8 @@ ax3.set_yscale("log")
 ax3.set_xlim((0, 28650))
 
 ax4 = fig.add_subplot(3, 2, 4)
-ax4.plot(x3, y31, 'r--', label='C-14')
-ax4.plot(x3, y32, 'g-', label='Ra-226')
+plot_engine.plot(ax4, x3, y31, 'r--', label='C-14')
+plot_engine.plot(ax4, x3, y32, 'g-', label='Ra-226')
 ax4.set_xlabel('Time (years)', fontsize='x-small')
 ax4.set_ylabel('Fraction Remaining', fontsize='x-small')
 ax4.set_title("Exponential Decay of Radioactive Elements", fontsize='x-small')
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Decimated drawing of large line and scatter plots
+"""
+
+import numpy as np
+import matplotlib as mpl
+
+# below this many points, data is handed to matplotlib unchanged
+DECIMATE_THRESHOLD = 100000
+
+# keyword arguments of ax.scatter that the binned image honours
+IMAGE_KWARGS = ('alpha', 'zorder', 'label')
+
+
+def axes_pixels(ax):
+    """
+    size of the axes on the canvas, in pixels
+
+    :param ax: matplotlib Axes
+
+    :return: tuple (width, height) of ints
+    """
+    box = ax.get_window_extent()
+    return max(int(np.ceil(box.width)), 1), max(int(np.ceil(box.height)), 1)
+
+
+def decimate_line(x, y, buckets):
+    """
+    keeps, in every x bucket, the first, last, lowest and highest
+    points: the polyline then rasterizes like the full one when there
+    is one bucket per pixel column
+
+    :param x: ndarray, shape(n,) sorted abscissas
+    :param y: ndarray, shape(n,) ordinates
+    :param buckets: int, number of buckets (pixel columns)
+
+    :return: tuple (x, y) of the kept points, in their original order
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    if len(x) <= 4 * buckets:
+        return x, y
+
+    span = x[-1] - x[0]
+    if span > 0:
+        bucket = ((x - x[0]) * (buckets / span)).astype(np.int64)
+        bucket = np.minimum(bucket, buckets - 1)
+    else:
+        bucket = np.zeros(len(x), dtype=np.int64)
+
+    # x is sorted: buckets are contiguous runs
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(x)] - 1
+    group = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(x)]))
+
+    keep = [starts, ends]
+    for extreme in (np.minimum, np.maximum):
+        value = extreme.reduceat(y, starts)
+        hits = np.flatnonzero(y == value[group])
+        # first hit of every bucket
+        keep.append(hits[np.r_[True, group[hits[1:]] != group[hits[:-1]]]])
+
+    kept = np.unique(np.concatenate(keep))
+    return x[kept], y[kept]
+
+
+def plot(ax, x, y, *args, **kwargs):
+    """
+    ax.plot(x, y, *args, **kwargs) on at most 4 points per pixel column
+    of the axes when x is sorted and has more than DECIMATE_THRESHOLD
+    points
+
+    :param ax: matplotlib Axes
+    :param x: array, sorted abscissas
+    :param y: array, ordinates
+
+    :return: list of Line2D, as ax.plot
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    if len(x) > DECIMATE_THRESHOLD and np.all(x[1:] >= x[:-1]):
+        x, y = decimate_line(x, y, axes_pixels(ax)[0])
+    return ax.plot(x, y, *args, **kwargs)
+
+
+def _limits(values, margin):
+    """
+    data range widened by matplotlib's relative margin
+
+    :param values: ndarray
+    :param margin: float, fraction of the range added on each side
+
+    :return: tuple (low, high)
+    """
+    low, high = float(np.min(values)), float(np.max(values))
+    pad = (high - low) * margin or 0.5
+    return low - pad, high + pad
+
+
+def _dilate(mask, radius):
+    """
+    grows the True cells of a 2-D mask by a disc of radius cells
+
+    :param mask: ndarray bool, shape(h,w)
+    :param radius: int
+
+    :return: ndarray bool, shape(h,w)
+    """
+    h, w = mask.shape
+    grown = mask.copy()
+    for di in range(-radius, radius + 1):
+        for dj in range(-radius, radius + 1):
+            if di * di + dj * dj > radius * radius or not (di or dj):
+                continue
+            grown[max(di, 0):h + min(di, 0), max(dj, 0):w + min(dj, 0)] |= \
+                mask[max(-di, 0):h + min(-di, 0), max(-dj, 0):w + min(-dj, 0)]
+    return grown
+
+
+def scatter(ax, x, y, c=None, s=None, density=False, cmap='viridis',
+            **kwargs):
+    """
+    ax.scatter(x, y, c=c, s=s, **kwargs) for up to DECIMATE_THRESHOLD
+    points; beyond, the points are binned on the pixel grid of the axes
+    (np.histogram2d) and drawn as one image
+
+    Per-point colors (c an array), non-linear axis scales (set the
+    scale before calling) and keyword arguments other than
+    IMAGE_KWARGS (marker, edgecolors, ...) are always handed to
+    ax.scatter
+
+    :param ax: matplotlib Axes
+    :param x: array, abscissas
+    :param y: array, ordinates
+    :param c: single color of the points
+    :param s: marker size in points ** 2 (rcParams default if None):
+    occupied pixels are grown by the marker radius
+    :param density: bool, color the pixels by their point count (log
+    scale, cmap) instead of the single color c
+    :param cmap: colormap of density
+
+    :return: PathCollection (ax.scatter) or AxesImage
+    """
+    x, y = np.ravel(x), np.ravel(y)
+    if len(x) <= DECIMATE_THRESHOLD \
+            or (c is not None and not mpl.colors.is_color_like(c)) \
+            or ax.get_xscale() != 'linear' or ax.get_yscale() != 'linear' \
+            or not set(kwargs) <= set(IMAGE_KWARGS):
+        return ax.scatter(x, y, c=c, s=s, **kwargs)
+
+    width, height = axes_pixels(ax)
+    xmargin, ymargin = ax.margins()
+    extent = _limits(x, xmargin) + _limits(y, ymargin)
+    counts, _, _ = np.histogram2d(y, x, bins=(height, width),
+                                  range=(extent[2:], extent[:2]))
+
+    if s is None:
+        s = mpl.rcParams['lines.markersize'] ** 2
+    # marker diameter: sqrt(s) points
+    radius = int(round(np.sqrt(s) / 2 * ax.figure.dpi / 72))
+
+    image = np.zeros((height, width, 4))
+    if density:
+        with np.errstate(divide='ignore'):
+            level = np.log1p(counts) / np.log1p(counts.max())
+        image[:] = mpl.colormaps[cmap](level)
+        image[..., 3] = counts > 0
+    else:
+        image[:] = mpl.colors.to_rgba(c if c is not None else 'C0')
+        image[..., 3] = _dilate(counts > 0, radius)
+    if 'alpha' in kwargs:
+        image[..., 3] *= kwargs['alpha']
+
+    artist = ax.imshow(image, extent=extent, origin='lower', aspect='auto',
+                       interpolation='nearest',
+                       zorder=kwargs.get('zorder', 1))
+    if 'label' in kwargs:
+        # legends skip images: the label goes to an empty scatter of
+        # the same color and size
+        color = mpl.colormaps[cmap](1.0) if density else image[0, 0, :3]
+        ax.scatter([], [], color=color, s=s, alpha=kwargs.get('alpha'),
+                   label=kwargs['label'])
+    # grow the view to the image without hiding what is already drawn
+    ax.update_datalim([extent[::2], extent[1::2]])
+    ax.autoscale_view()
+    return artist
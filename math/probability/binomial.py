@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
 """Binomial Class"""
+from math import comb, exp, lgamma
+import numpy as np
+probability_engine = __import__('probability_engine')
 
 
-class Binomial:
+class Binomial(probability_engine.StreamFit, probability_engine.CachedCDF):
     """ Class Binomial"""
     def __init__(self, data=None, n=1, p=0.5):
         """Class constructor"""
@@ -13,6 +16,7 @@ class Binomial:
                 raise ValueError("p must be greater than 0 and less than 1")
             self.n = int(n)
             self.p = float(p)
+            self.moments = None
         else:
             if type(data) != list:
                 raise TypeError("data must be a list")
@@ -23,32 +27,89 @@ class Binomial:
             variance = sum(sum_variance) / (len(data))
             self.n = round(mean / (1 - (variance / mean)))
             self.p = mean / self.n
+            self.moments = probability_engine.Moments().update(data)
+
+    def fit_moments(self):
+        """Sets n and p from the running moments, once they give n >= 1
+        and 0 < p < 1 (positive mean, variance below the mean)"""
+        mean, variance = self.moments.mean, self.moments.variance
+        if mean <= 0 or variance >= mean:
+            return False
+        n = round(mean / (1 - (variance / mean)))
+        if n < 1 or mean >= n:
+            return False
+        self.n = n
+        self.p = mean / n
+        return True
 
     def pmf(self, k):
-        """Calculates the PMF"""
-        if k is not int:
+        """Calculates the PMF
+
+        k may be an array of counts: the PMF is then evaluated in log
+        space and returned as an ndarray, as are the scalar counts for
+        which n choose k overflows a float"""
+        if not probability_engine.is_scalar(k):
+            return np.exp(self.logpmf(k))
+        if not isinstance(k, int):
             k = int(k)
-        if k < 0:
+        if k < 0 or k > self.n:
             return 0
-        nfact = 1
-        kfact = 1
-        nkfact = 1
-        for i in range(1, self.n + 1):
-            nfact = nfact * i
-        for i in range(1, k + 1):
-            kfact = kfact * i
-        for i in range(1, self.n - k + 1):
-            nkfact = nkfact * i
-        nk = nfact / (kfact * (nkfact))
-        return nk * self.p ** k * (1 - self.p) ** (self.n - k)
+        try:
+            nk = comb(self.n, k)
+            return nk * self.p ** k * (1 - self.p) ** (self.n - k)
+        except OverflowError:
+            # n choose k beyond the float range
+            return exp(self.logpmf(k))
 
     def cdf(self, k):
-        """Calculates the CDF"""
-        if k is not int:
-            k = int(k)
-        if k < 0:
-            return 0
-        cdf = 0
-        for i in range(0, k + 1):
-            cdf += self.pmf(i)
-        return cdf
+        """Calculates the CDF
+
+        Read in O(1) per k (scalar or array) from a cumulative table
+        cached on the instance and rebuilt when n or p change"""
+        scalar = probability_engine.is_scalar(k)
+        cdf = self.cdf_table().cdf(probability_engine.as_counts(k))
+        return probability_engine.scalar_or_array(cdf, scalar)
+
+    def parameters(self):
+        """Parameters the cached CDF table depends on"""
+        return self.n, self.p
+
+    def mean_variance(self):
+        """Mean and variance of the distribution"""
+        return self.n * self.p, self.n * self.p * (1 - self.p)
+
+    def support(self):
+        """First and last possible counts"""
+        return 0, self.n
+
+    def logpmf(self, k):
+        """Calculates the log of the PMF, -inf outside 0..n"""
+        scalar = probability_engine.is_scalar(k)
+        k = probability_engine.as_counts(k)
+        inside = (k >= 0) & (k <= self.n)
+        k = np.where(inside, k, 0)
+        if scalar:
+            log_comb = lgamma(self.n + 1) - lgamma(k + 1) \
+                - lgamma(self.n - k + 1)
+        else:
+            # n!, k! and (n - k)! from the same source, so that their
+            # rounding errors do not bias the PMF
+            log_fact = probability_engine.log_factorial(
+                np.stack((np.full_like(k, self.n), k, self.n - k)))
+            log_comb = log_fact[0] - log_fact[1] - log_fact[2]
+        log_pmf = log_comb + k * np.log(self.p) \
+            + (self.n - k) * np.log1p(-self.p)
+        return probability_engine.scalar_or_array(
+            np.where(inside, log_pmf, -np.inf), scalar)
+
+    def log_ratio(self, k):
+        """log(pmf(k + 1) / pmf(k)), bounds the tails of the CDF table"""
+        k = np.asarray(k, dtype=np.float64)
+        return np.log((self.n - k) * self.p) - np.log((k + 1) * (1 - self.p))
+
+    def sample(self, size=None, rng=None):
+        """Draws size counts (int or shape tuple), reproducible through
+        rng (np.random.Generator or seed); BTPE when n * p >= 30,
+        inversion below"""
+        return probability_engine.generator(rng).binomial(self.n, self.p,
+                                                          size)
@@ -1,11 +1,13 @@
 #!/usr/bin/env python3
 """Exponential class"""
+import numpy as np
+probability_engine = __import__('probability_engine')
 
 
 e = 2.7182818285
 
 
-class Exponential:
+class Exponential(probability_engine.StreamFit):
     """Class Exponential"""
     def __init__(self, data=None, lambtha=1.):
         """Class constructor"""
@@ -13,21 +15,67 @@ class Exponential:
             if lambtha <= 0:
                 raise ValueError("lambtha must be a positive value")
             self.lambtha = float(lambtha)
+            self.moments = None
         else:
             if type(data) != list:
                 raise TypeError("data must be a list")
             elif len(data) < 2:
                 raise ValueError("data must contain multiple values")
             self.lambtha = 1 / (sum(data)/len(data))
+            self.moments = probability_engine.Moments().update(data)
+
+    def fit_moments(self):
+        """Sets lambtha from the running moments, once their mean is
+        positive"""
+        if self.moments.mean <= 0:
+            return False
+        self.lambtha = 1 / self.moments.mean
+        return True
 
     def pdf(self, x):
-        """Calculates the PDF"""
+        """Calculates the PDF (x may be an array, an ndarray is returned)"""
+        if not probability_engine.is_scalar(x):
+            x = np.asarray(x, dtype=np.float64)
+            return np.where(x < 0, 0.,
+                            self.lambtha * np.exp(-self.lambtha * x))
         if x < 0:
             return 0
         return self.lambtha * e ** (-self.lambtha * x)
 
     def cdf(self, x):
-        """Calculates the CDF"""
+        """Calculates the CDF (x may be an array, an ndarray is returned)"""
+        if not probability_engine.is_scalar(x):
+            x = np.asarray(x, dtype=np.float64)
+            return np.where(x < 0, 0., -np.expm1(-self.lambtha * x))
         if x < 0:
             return 0
         return 1 - e ** (-self.lambtha * x)
+
+    def logpdf(self, x):
+        """Calculates the log of the PDF, -inf for x < 0"""
+        scalar = probability_engine.is_scalar(x)
+        x = np.asarray(x, dtype=np.float64)
+        return probability_engine.scalar_or_array(
+            np.where(x < 0, -np.inf, np.log(self.lambtha) - self.lambtha * x),
+            scalar)
+
+    def logcdf(self, x):
+        """Calculates the log of the CDF, -inf for x <= 0"""
+        scalar = probability_engine.is_scalar(x)
+        x = np.asarray(x, dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_cdf = np.log(-np.expm1(-self.lambtha * np.maximum(x, 0)))
+        return probability_engine.scalar_or_array(log_cdf, scalar)
+
+    def sf(self, x):
+        """Calculates the survival function 1 - CDF, exact in the tail"""
+        scalar = probability_engine.is_scalar(x)
+        x = np.asarray(x, dtype=np.float64)
+        return probability_engine.scalar_or_array(
+            np.where(x < 0, 1., np.exp(-self.lambtha * x)), scalar)
+
+    def sample(self, size=None, rng=None):
+        """Draws size values (int or shape tuple), reproducible through
+        rng (np.random.Generator or seed); NumPy's ziggurat sampler"""
+        return probability_engine.generator(rng).exponential(
+            1 / self.lambtha, size)
@@ -1,12 +1,14 @@
 #!/usr/bin/env python3
 """Normal Class"""
+import numpy as np
+probability_engine = __import__('probability_engine')
 
 
 pi = 3.1415926536
 e = 2.7182818285
 
 
-class Normal:
+class Normal(probability_engine.StreamFit):
     """Class Normal"""
     def __init__(self, data=None, mean=0., stddev=1.):
         """Class constructor"""
@@ -15,6 +17,7 @@ class Normal:
                 raise ValueError("stddev must be a positive value")
             self.stddev = float(stddev)
             self.mean = float(mean)
+            self.moments = None
         else:
             if type(data) != list:
                 raise TypeError("data must be a list")
@@ -25,6 +28,13 @@ class Normal:
             for x in data:
                 self.stddev += (x - self.mean) ** 2
             self.stddev = (self.stddev / len(data)) ** (1/2)
+            self.moments = probability_engine.Moments().update(data)
+
+    def fit_moments(self):
+        """Sets mean and stddev from the running moments"""
+        self.mean = self.moments.mean
+        self.stddev = self.moments.variance ** (1 / 2)
+        return True
 
     def z_score(self, x):
         """Calculates the z-score of a given x-value"""
@@ -35,12 +45,49 @@ class Normal:
         return z * self.stddev + self.mean
 
     def pdf(self, x):
-        """Calculates the PDF"""
+        """Calculates the PDF (x may be an array, an ndarray is returned)"""
+        if not probability_engine.is_scalar(x):
+            x = np.asarray(x, dtype=np.float64)
         return (1 / (self.stddev * (2 * pi) ** (1 / 2))) * e ** (-(1 / 2) * ((
             x - self.mean) / self.stddev) ** 2)
 
     def cdf(self, x):
-        """Calculates the CDF"""
-        y = (x - self.mean) / (self.stddev * 2 ** (1 / 2))
-        return 1 / 2 * (1 + (2 / pi ** (1 / 2) * (y - (y ** 3 / 3) + (
-            y ** 5 / 10) - (y ** 7 / 42) + (y ** 9 / 216))))
+        """Calculates the CDF (x may be an array, an ndarray is returned)
+
+        Computed as erfc(-y) / 2 with a rational approximation of erfc,
+        accurate to the last digits in both tails"""
+        scalar = probability_engine.is_scalar(x)
+        y = (np.asarray(x, dtype=np.float64) - self.mean) \
+            / (self.stddev * 2 ** (1 / 2))
+        return probability_engine.scalar_or_array(
+            probability_engine.erfc(-y) / 2, scalar)
+
+    def sf(self, x):
+        """Calculates the survival function 1 - CDF, without cancellation
+        in the right tail"""
+        scalar = probability_engine.is_scalar(x)
+        y = (np.asarray(x, dtype=np.float64) - self.mean) \
+            / (self.stddev * 2 ** (1 / 2))
+        return probability_engine.scalar_or_array(
+            probability_engine.erfc(y) / 2, scalar)
+
+    def logpdf(self, x):
+        """Calculates the log of the PDF"""
+        scalar = probability_engine.is_scalar(x)
+        z = (np.asarray(x, dtype=np.float64) - self.mean) / self.stddev
+        return probability_engine.scalar_or_array(
+            -z * z / 2 - np.log(self.stddev) - np.log(2 * np.pi) / 2, scalar)
+
+    def logcdf(self, x):
+        """Calculates the log of the CDF, finite far in the left tail"""
+        scalar = probability_engine.is_scalar(x)
+        y = (np.asarray(x, dtype=np.float64) - self.mean) \
+            / (self.stddev * 2 ** (1 / 2))
+        return probability_engine.scalar_or_array(
+            probability_engine.log_erfc(-y) - np.log(2), scalar)
+
+    def sample(self, size=None, rng=None):
+        """Draws size values (int or shape tuple), reproducible through
+        rng (np.random.Generator or seed); NumPy's ziggurat sampler"""
+        return probability_engine.generator(rng).normal(self.mean,
+                                                        self.stddev, size)
@@ -1,11 +1,16 @@
 #!/usr/bin/env python3
 """Poisson class"""
+from math import exp, factorial, lgamma
+import numpy as np
+probability_engine = __import__('probability_engine')
 
 
 e = 2.7182818285
+# largest k whose factorial fits in a float
+MAX_FACTORIAL = 170
 
 
-class Poisson:
+class Poisson(probability_engine.StreamFit, probability_engine.CachedCDF):
     """Class Poisson"""
     def __init__(self, data=None, lambtha=1.):
         """Class constructor"""
@@ -13,31 +18,84 @@ class Poisson:
             if lambtha <= 0:
                 raise ValueError("lambtha must be a positive value")
             self.lambtha = float(lambtha)
+            self.moments = None
         else:
             if type(data) is not list:
                 raise TypeError("data must be a list")
             elif len(data) < 2:
                 raise ValueError("data must contain multiple values")
             self.lambtha = sum(data)/len(data)
+            self.moments = probability_engine.Moments().update(data)
+
+    def fit_moments(self):
+        """Sets lambtha from the running moments, once their mean is
+        positive"""
+        if self.moments.mean <= 0:
+            return False
+        self.lambtha = self.moments.mean
+        return True
 
     def pmf(self, k):
-        """Calculates the PMF"""
+        """Calculates the PMF
+
+        k may be an array of counts: the PMF is then evaluated in log
+        space and returned as an ndarray. Scalar counts whose factorial
+        or power overflows a float are evaluated in log space too"""
+        if not probability_engine.is_scalar(k):
+            return np.exp(self.logpmf(k))
         if type(k) is not int:
             k = int(k)
         if k < 0:
             return 0
-        fact = 1
-        for i in range(1, k + 1):
-            fact = fact * i
-        return (e ** -self.lambtha * self.lambtha ** k) / fact
+        if k <= MAX_FACTORIAL:
+            try:
+                return (e ** -self.lambtha * self.lambtha ** k) / factorial(k)
+            except OverflowError:
+                pass
+        return exp(self.logpmf(k))
 
     def cdf(self, k):
-        """Calculates the CDF"""
-        if type(k) is not int:
-            k = int(k)
-        if k < 0:
-            return 0
-        cdf = 0
-        for i in range(k + 1):
-            cdf += self.pmf(i)
-        return cdf
+        """Calculates the CDF
+
+        Read in O(1) per k (scalar or array) from a cumulative table
+        cached on the instance and rebuilt when lambtha changes"""
+        scalar = probability_engine.is_scalar(k)
+        cdf = self.cdf_table().cdf(probability_engine.as_counts(k))
+        return probability_engine.scalar_or_array(cdf, scalar)
+
+    def parameters(self):
+        """Parameters the cached CDF table depends on"""
+        return self.lambtha,
+
+    def mean_variance(self):
+        """Mean and variance of the distribution"""
+        return self.lambtha, self.lambtha
+
+    def support(self):
+        """First and last possible counts"""
+        return 0, None
+
+    def log_ratio(self, k):
+        """log(pmf(k + 1) / pmf(k)), bounds the tails of the CDF table"""
+        k = np.asarray(k, dtype=np.float64)
+        return np.log(self.lambtha) - np.log(k + 1)
+
+    def logpmf(self, k):
+        """Calculates the log of the PMF, -inf for k < 0"""
+        scalar = probability_engine.is_scalar(k)
+        k = probability_engine.as_counts(k)
+        inside = k >= 0
+        k = np.where(inside, k, 0)
+        if scalar:
+            log_fact = lgamma(k + 1)
+        else:
+            log_fact = probability_engine.log_factorial(k)
+        log_pmf = -self.lambtha + k * np.log(self.lambtha) - log_fact
+        return probability_engine.scalar_or_array(
+            np.where(inside, log_pmf, -np.inf), scalar)
+
+    def sample(self, size=None, rng=None):
+        """Draws size counts (int or shape tuple), reproducible through
+        rng (np.random.Generator or seed); PTRS when lambtha >= 10,
+        multiplication of uniforms below"""
+        return probability_engine.generator(rng).poisson(self.lambtha, size)
@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""Helpers shared by the distribution classes"""
+from itertools import islice
+import numpy as np
+
+
+def is_scalar(x):
+    """True for a Python number, which keeps the scalar code paths"""
+    return np.ndim(x) == 0 and not isinstance(x, np.ndarray)
+
+
+def as_counts(k):
+    """Converts counts to a NumPy array of int64, truncated like int()"""
+    return np.trunc(np.asarray(k, dtype=np.float64)).astype(np.int64)
+
+
+def log_factorials(n):
+    """Returns log(k!) for k = 0..n, one cumulative sum in O(n)"""
+    table = np.zeros(max(int(n), 0) + 1)
+    np.cumsum(np.log(np.arange(1, len(table))), out=table[1:])
+    return table
+
+
+# counts from which log(k!) is taken from Stirling's series
+STIRLING_MIN = 256
+
+
+def _stirling(k):
+    """log(k!) = lgamma(k + 1) from Stirling's series, exact to
+    rounding for k >= STIRLING_MIN"""
+    z = np.asarray(k, dtype=np.float64) + 1
+    w = 1 / (z * z)
+    series = (1 / 12 - w * (1 / 360 - w / 1260)) / z
+    return (z - 0.5) * np.log(z) - z + np.log(2 * np.pi) / 2 + series
+
+
+def log_factorial(k):
+    """Returns log(k!) element-wise for an array of counts k >= 0, from
+    a table below STIRLING_MIN, else from Stirling's series (no
+    per-element Python loop); the rounding errors of a long cumulative
+    sum would grow with k"""
+    k = np.asarray(k, dtype=np.int64)
+    small = log_factorials(STIRLING_MIN)
+    return np.where(k < STIRLING_MIN,
+                    small[np.minimum(k, STIRLING_MIN)], _stirling(k))
+
+
+def scalar_or_array(value, scalar):
+    """Returns value as a float for a scalar query, else as an ndarray"""
+    return float(value) if scalar else np.asarray(value)
+
+
+def log_tail(log_pmf):
+    """Returns log(sum(pmf[i + 1:])) for every i from log(pmf),
+    accumulated from the end in log space (no cancellation)"""
+    tail = np.full(len(log_pmf), -np.inf)
+    tail[:-1] = np.logaddexp.accumulate(log_pmf[:0:-1])[::-1]
+    return tail
+
+
+# W. J. Cody, "Rational Chebyshev approximations for the error
+# function", Math. Comp. 23 (1969): relative error below 1e-16
+ERF_A = (3.16112374387056560e00, 1.13864154151050156e02,
+         3.77485237685302021e02, 3.20937758913846947e03,
+         1.85777706184603153e-1)
+ERF_B = (2.36012909523441209e01, 2.44024637934444173e02,
+         1.28261652607737228e03, 2.84423683343917062e03)
+ERF_C = (5.64188496988670089e-1, 8.88314979438837594e00,
+         6.61191906371416295e01, 2.98635138197400131e02,
+         8.81952221241769090e02, 1.71204761263407058e03,
+         2.05107837782607147e03, 1.23033935479799725e03,
+         2.15311535474403846e-8)
+ERF_D = (1.57449261107098347e01, 1.17693950891312499e02,
+         5.37181101862009858e02, 1.62138957456669019e03,
+         3.29079923573345963e03, 4.36261909014324716e03,
+         3.43936767414372164e03, 1.23033935480374942e03)
+ERF_P = (3.05326634961232344e-1, 3.60344899949804439e-1,
+         1.25781726111229246e-1, 1.60837851487422766e-2,
+         6.58749161529837803e-4, 1.63153871373020978e-2)
+ERF_Q = (2.56852019228982242e00, 1.87295284992346725e00,
+         5.27905102951428412e-1, 6.05183413124413191e-2,
+         2.33520497626869185e-3)
+ERF_SMALL = 0.46875
+ERF_MID = 4.
+
+
+def _erf_small(x):
+    """erf(x) for |x| <= ERF_SMALL"""
+    z = x * x
+    num, den = ERF_A[4] * z, z
+    for a, b in zip(ERF_A[:3], ERF_B[:3]):
+        num, den = (num + a) * z, (den + b) * z
+    return x * (num + ERF_A[3]) / (den + ERF_B[3])
+
+
+def _erfcx_large(y):
+    """exp(y ** 2) * erfc(y) for y > ERF_SMALL"""
+    y = np.asarray(y, dtype=np.float64)
+    # ERF_SMALL < y <= ERF_MID
+    num, den = ERF_C[8] * y, y
+    for c, d in zip(ERF_C[:7], ERF_D[:7]):
+        num, den = (num + c) * y, (den + d) * y
+    mid = (num + ERF_C[7]) / (den + ERF_D[7])
+    # y > ERF_MID, asymptotic form in 1 / y ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = 1 / (y * y)
+        num, den = ERF_P[5] * z, z
+        for p, q in zip(ERF_P[:4], ERF_Q[:4]):
+            num, den = (num + p) * z, (den + q) * z
+        far = (1 / np.sqrt(np.pi) - z * (num + ERF_P[4])
+               / (den + ERF_Q[4])) / y
+    return np.where(y <= ERF_MID, mid, far)
+
+
+def _exp_minus_square(y):
+    """exp(-y ** 2), with y ** 2 split to keep its rounding error out"""
+    head = np.trunc(y * 16) / 16
+    return np.exp(-head * head) * np.exp(-(y - head) * (y + head))
+
+
+def erfc(x):
+    """Complementary error function, element-wise"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.abs(x)
+    with np.errstate(over='ignore', invalid='ignore'):
+        large = _exp_minus_square(y) * _erfcx_large(y)
+        large = np.where(np.isinf(y), 0., large)
+        result = np.where(y <= ERF_SMALL, 1 - _erf_small(x),
+                          np.where(x < 0, 2 - large, large))
+    return result[()]
+
+
+def erf(x):
+    """Error function, element-wise"""
+    x = np.asarray(x, dtype=np.float64)
+    with np.errstate(over='ignore', invalid='ignore'):
+        result = np.where(np.abs(x) <= ERF_SMALL, _erf_small(x),
+                          1 - erfc(x))
+    return result[()]
+
+
+def log_erfc(x):
+    """log(erfc(x)), element-wise, finite far beyond the underflow of
+    erfc (x > 26.5)"""
+    x = np.asarray(x, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        far = -x * x + np.log(_erfcx_large(np.maximum(x, 1.)))
+        result = np.where(x > 1., far, np.log(erfc(x)))
+    return result[()]
+
+
+def generator(rng=None):
+    """Returns a np.random.Generator: rng itself, or one seeded by rng
+    (None for fresh entropy)"""
+    if isinstance(rng, np.random.Generator):
+        return rng
+    return np.random.default_rng(rng)
+
+
+# values read at a time from a stream
+STREAM_CHUNK = 2 ** 16
+
+
+def chunks(iterable, size=STREAM_CHUNK):
+    """Yields lists of at most size values read from iterable"""
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+class Moments:
+    """Running count, mean and sum of squared deviations (m2) of a data
+    stream, updated in one pass (Welford) and mergeable across workers
+    (Chan et al. pairwise update)"""
+
+    def __init__(self, count=0, mean=0., m2=0.):
+        """Moments of count values"""
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def update(self, chunk):
+        """Adds a chunk of values (list, array or iterable)"""
+        if hasattr(chunk, '__len__'):
+            values = np.asarray(chunk, dtype=np.float64).ravel()
+        else:
+            values = np.fromiter(chunk, dtype=np.float64)
+        if not len(values):
+            return self
+        mean = values.mean()
+        m2 = np.sum((values - mean) ** 2)
+        return self.merge(Moments(len(values), float(mean), float(m2)))
+
+    def merge(self, other):
+        """Adds the values summarized by other"""
+        count = self.count + other.count
+        if not other.count:
+            return self
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        return self
+
+    @property
+    def variance(self):
+        """Population variance, as the constructors compute it"""
+        return self.m2 / self.count
+
+
+class StreamFit:
+    """Mixin fitting a distribution from running Moments: the class
+    sets self.moments and implements fit_moments(), which sets the
+    parameters and returns True, or returns False and leaves them
+    unchanged when the moments do not give valid parameters"""
+
+    def _refit(self):
+        """Refits once there are at least 2 values; True on success"""
+        return self.moments.count >= 2 and self.fit_moments()
+
+    def partial_fit(self, chunk):
+        """Updates the fit with a chunk of data, in one pass and in
+        constant memory; returns self
+
+        The parameters are derived from the data seen so far only, once
+        they give valid ones (at least 2 values, e.g. a positive mean);
+        until then the current parameters are kept. The parameters of
+        an instance built from parameters are not used as a prior: they
+        are replaced by the first valid fit"""
+        if self.moments is None:
+            self.moments = Moments()
+        self.moments.update(chunk)
+        self._refit()
+        return self
+
+    def merge(self, other):
+        """Adds the data fitted by other (e.g. another worker) to this
+        fit; returns self"""
+        if other.moments is not None:
+            if self.moments is None:
+                self.moments = Moments()
+            self.moments.merge(other.moments)
+            self._refit()
+        return self
+
+    @classmethod
+    def from_stream(cls, iterable, chunk_size=STREAM_CHUNK):
+        """Fits a new instance from an iterable of any length, read
+        chunk_size values at a time"""
+        fitted = cls()
+        for chunk in chunks(iterable, chunk_size):
+            fitted.partial_fit(chunk)
+        if fitted.moments is None or fitted.moments.count < 2:
+            raise ValueError("data must contain multiple values")
+        if not fitted.fit_moments():
+            raise ValueError("data do not give valid parameters")
+        return fitted
+
+
+def tail_bound(variance, epsilon):
+    """Returns t such that P(|X - mean| >= t) <= epsilon for a sum of
+    independent variables in [0, 1] (Bernstein's inequality), which
+    covers the binomial and, as its limit, the Poisson distribution"""
+    log_eps = np.log(2 / epsilon)
+    return log_eps / 3 + (log_eps ** 2 / 9 + 2 * log_eps * variance) ** (1 / 2)
+
+
+class CDFTable:
+    """Cumulative distribution of a discrete distribution over the
+    counts lo..hi holding all but epsilon of its mass: O(1) cdf, logcdf
+    and sf, and O(log(hi - lo)) ppf by binary search"""
+
+    def __init__(self, lo, log_pmf, log_below=-np.inf, log_above=-np.inf):
+        """Table of the counts lo, lo + 1, ... with the given log-PMF;
+        log_below and log_above are the logs of the mass left below lo
+        and above the table"""
+        self.lo = lo
+        # normalized so that it ends at 1 - P(X > hi): the rounding
+        # errors of the PMF do not leave a gap below 1
+        cumulative = np.cumsum(np.exp(log_pmf))
+        top = -np.expm1(log_above) - np.exp(log_below)
+        self.cumulative = np.minimum(
+            np.exp(log_below) + cumulative * (top / cumulative[-1]), 1)
+        # log-space copies, seeded with the mass outside the table
+        self.log_cumulative = np.minimum(np.logaddexp.accumulate(
+            np.concatenate(([log_below], log_pmf)))[1:], 0)
+        self.log_sf = np.logaddexp(log_tail(log_pmf), log_above)
+
+    @property
+    def hi(self):
+        """Last count of the table"""
+        return self.lo + len(self.cumulative) - 1
+
+    def cdf(self, k):
+        """P(X <= k) for an array of counts, 0 below and 1 above the
+        table (off by at most epsilon)"""
+        k = np.asarray(k)
+        inside = np.clip(k - self.lo, 0, len(self.cumulative) - 1)
+        return np.where(k < self.lo, 0.,
+                        np.where(k > self.hi, 1., self.cumulative[inside]))
+
+    def ppf(self, q):
+        """Smallest count k with P(X <= k) >= q, for an array of q;
+        hi + 1 for the q above the last entry, for which cdf is 1"""
+        q = np.asarray(q, dtype=np.float64)
+        if np.any((q < 0) | (q > 1)):
+            raise ValueError("q must be between 0 and 1")
+        return self.lo + np.searchsorted(self.cumulative, q)
+
+    def inside(self, k):
+        """Mask of the counts of the table, and their clipped indices"""
+        return (k >= self.lo) & (k <= self.hi), \
+            np.clip(k - self.lo, 0, len(self.cumulative) - 1)
+
+
+class CachedCDF:
+    """Mixin keeping a CDFTable per instance, built on first use and
+    rebuilt when parameters() changes; the class implements
+    parameters(), mean_variance(), support(), logpmf() and log_ratio()
+    (log(pmf(k + 1) / pmf(k))); tails beyond the table are summed term
+    by term until the rest, bounded by a geometric series with that
+    ratio, is negligible"""
+
+    # probability mass left out of the table
+    table_epsilon = 1e-15
+
+    def cdf_table(self):
+        """Returns the CDFTable of the current parameters"""
+        key = (self.parameters(), self.table_epsilon)
+        cache = getattr(self, '_cdf_cache', None)
+        if cache is None or cache[0] != key:
+            mean, variance = self.mean_variance()
+            t = tail_bound(variance, self.table_epsilon)
+            first, last = self.support()
+            lo = max(int(np.floor(mean - t)), first)
+            hi = int(np.ceil(mean + t))
+            if last is not None:
+                hi = min(hi, last)
+            table = CDFTable(lo, self.logpmf(np.arange(lo, hi + 1)),
+                             self._log_tail(np.array([lo - 1]), -1)[0],
+                             self._log_tail(np.array([hi + 1]), 1)[0])
+            cache = self._cdf_cache = (key, table)
+        return cache[1]
+
+    def _log_lower(self, k):
+        """log(P(X <= k)) far below the mean: pmf(k) / (1 - r), r the
+        ratio pmf(k - 1) / pmf(k), which only decreases below k"""
+        first, _ = self.support()
+        count = np.maximum(k, first)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_cdf = self.logpmf(count) \
+                - np.log1p(-np.exp(-self.log_ratio(count - 1)))
+        return np.where(k < first, -np.inf, log_cdf)
+
+    def _log_upper(self, k):
+        """log(P(X > k)) far above the mean: pmf(k + 1) / (1 - r), r the
+        ratio pmf(k + 2) / pmf(k + 1), which only decreases above k"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_sf = self.logpmf(k + 1) \
+                - np.log1p(-np.exp(self.log_ratio(k + 1)))
+        return np.where(np.isnan(log_sf), -np.inf, log_sf)
+
+    def _log_tail(self, start, step, length=64):
+        """log(sum(pmf(k) for k = start, start + step, ...)) for an
+        array of start counts beyond the mode, step -1 (lower tail) or
+        1 (upper tail)
+
+        The sorted starts split the tail into segments, each summed
+        exactly up to the next start, over windows of length counts
+        grown until the rest, bounded geometrically, is below exp(-40)
+        of the sum; the segments are then accumulated"""
+        counts, inverse = np.unique(start, return_inverse=True)
+        # counts from a start to the next one in the direction of step
+        gaps = np.full(len(counts), np.inf)
+        if step > 0:
+            gaps[:-1] = np.diff(counts)
+        else:
+            gaps[1:] = np.diff(counts)
+        segments = np.empty(len(counts))
+        todo = np.arange(len(counts))
+        while todo.size:
+            left = []
+            # at most 2 ** 22 terms in memory at a time
+            rows = max(1, 2 ** 22 // length)
+            for batch in (todo[i:i + rows]
+                          for i in range(0, len(todo), rows)):
+                offsets = np.arange(length)
+                window = counts[batch, np.newaxis] + step * offsets
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    logs = self.logpmf(window)
+                logs[offsets >= gaps[batch, np.newaxis]] = -np.inf
+                total = np.logaddexp.reduce(logs, axis=1)
+                end = window[:, -1]
+                rest = self._log_lower(end - 1) if step < 0 \
+                    else self._log_upper(end)
+                covered = gaps[batch] <= length
+                done = covered | (rest <= total - 40)
+                segments[batch[done]] = np.where(
+                    covered, total, np.logaddexp(total, rest))[done]
+                left.append(batch[~done])
+            todo = np.concatenate(left)
+            length *= 4
+        if step > 0:
+            tails = np.logaddexp.accumulate(segments[::-1])[::-1]
+        else:
+            tails = np.logaddexp.accumulate(segments)
+        return tails[inverse].reshape(np.shape(start))
+
+    def logcdf(self, k):
+        """Calculates the log of the CDF: read from the cached table,
+        as log(1 - sf) where the CDF is close to 1, and summed in log
+        space beyond the table"""
+        scalar = is_scalar(k)
+        k = as_counts(k)
+        table = self.cdf_table()
+        _, index = table.inside(k)
+        log_sf = np.array(table.log_sf[index])
+        below, above = k < table.lo, k > table.hi
+        log_sf[above] = self._log_tail(k[above] + 1, 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_cdf = np.array(np.where(log_sf < -np.log(2),
+                                        np.log1p(-np.exp(log_sf)),
+                                        table.log_cumulative[index]))
+        log_cdf[below] = self._log_tail(k[below], -1)
+        return scalar_or_array(log_cdf, scalar)
+
+    def sf(self, k):
+        """Calculates the survival function P(X > k): read from the
+        cached table, summed over the upper tail rather than as
+        1 - CDF, and summed in log space beyond the table"""
+        scalar = is_scalar(k)
+        k = as_counts(k)
+        table = self.cdf_table()
+        _, index = table.inside(k)
+        sf = np.array(np.exp(table.log_sf[index]))
+        below, above = k < table.lo, k > table.hi
+        sf[below] = -np.expm1(self._log_tail(k[below], -1))
+        sf[above] = np.exp(self._log_tail(k[above] + 1, 1))
+        return scalar_or_array(sf, scalar)
+
+    def ppf(self, q):
+        """Calculates the quantile function, smallest k with
+        CDF(k) >= q, by binary search in the cached table"""
+        scalar = is_scalar(q)
+        k = self.cdf_table().ppf(q)
+        # the table is truncated: below it, q = 0 is reached at the
+        # first count of the support; above it, q = 1 at the last one
+        # (if bounded)
+        first, last = self.support()
+        k = np.where(np.asarray(q) == 0, first, k)
+        if last is not None:
+            k = np.where(np.asarray(q) == 1, last, np.minimum(k, last))
+        return int(k) if scalar else k
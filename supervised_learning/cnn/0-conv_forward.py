@@ -3,19 +3,41 @@
     Convolutional Forward Propagation
 """
 
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
+cnn_engine = __import__('cnn_engine')
 
+# fixed number of chunks split across workers: results do not depend
+# on the number of workers
+PARALLEL_CHUNKS = 16
 
-def conv_forward(A_prev, W, b, activation, padding="same", stride=(1, 1)):
+
+def conv_forward(A_prev, W, b, activation, padding="same", stride=(1, 1),
+                 workers=None, axis='m', dtype=None, out=None,
+                 workspace=None, algorithm='auto'):
     """
         function that performs forward propagation over a conv layer of NN
 
         :param A_prev: ndarray, shape(m,h_prev,w_prev,c_prev) output layer
         :param W: ndarray, shape(kh,kw,c_prev,c_new) kernel
         :param b: ndarray, shape(1,1,1,c_new) biases
-        :param activation: activation function
+        :param activation: activation function, or 'relu', 'tanh',
+        'sigmoid', 'linear' (np.tanh and None are recognized too): bias
+        and known activations are applied in place on the GEMM output
         :param padding: string 'same' or 'valid'
         :param stride: tuple (sh,sw)
+        :param workers: int, if set split the convolution across a thread
+        pool (NumPy releases the GIL in BLAS)
+        :param axis: 'm' (batch) or 'c_new' (kernels), axis split by workers
+        :param dtype: None (float64), 'float32' or 'mixed' (float16
+        storage, float32 accumulation)
+        :param out: ndarray, shape(m,h_new,w_new,c_new), written in place
+        if given
+        :param workspace: cnn_engine.Workspace, padded, im2col and product
+        buffers reused across calls
+        :param algorithm: 'im2col', 'winograd' (Winograd F(2x2, 3x3),
+        3x3 kernels and stride (1, 1) only, else ValueError) or 'auto',
+        currently im2col
 
         :return: output of the convolutional layer
     """
@@ -36,31 +58,81 @@ def conv_forward(A_prev, W, b, activation, padding="same", stride=(1, 1)):
     output_height = int((h_prev - kh + 2 * ph) / sh + 1)
     output_width = int((w_prev - kw + 2 * pw) / sw + 1)
 
-    # initialize output
-    convolved_images = np.zeros((m, output_height, output_width, c_new))
+    storage, accumulation = cnn_engine.resolve_dtype(dtype)
+    W = np.asarray(W, dtype=accumulation)
+
+    # pad image, in the storage precision
+    if workspace is not None:
+        image_pad = workspace.padded(A_prev, ph, pw, storage)
+    else:
+        image_pad = np.pad(np.asarray(A_prev, dtype=storage),
+                           ((0, 0), (ph, ph),
+                            (pw, pw), (0, 0)), mode='constant')
+    output_shape = (m, output_height, output_width, c_new)
+
+    # view of every window, shape(m, oh, ow, kh, kw, c_prev), no copy
+    windows = cnn_engine.sliding_windows(image_pad, (kh, kw), stride,
+                                         (output_height, output_width))
+
+    if algorithm == 'auto':
+        # Winograd saves multiplications but not time against one BLAS
+        # GEMM: im2col stays the default
+        algorithm = 'im2col'
+
+    if algorithm == 'winograd':
+        if (kh, kw) != (3, 3) or (sh, sw) != (1, 1):
+            raise ValueError("winograd requires a 3x3 kernel and stride "
+                             "(1, 1)")
+        # 2.25x fewer multiplications than the direct method
+        convolved_images = cnn_engine.winograd_conv3x3(
+            image_pad, W, (output_height, output_width), accumulation)
+    elif workers is None and workspace is None:
+        # convolution: one GEMM (m*oh*ow, kh*kw*c_prev) @ (.., c_new)
+        convolved_images = np.tensordot(windows, W, axes=3)
+    elif workers is None:
+        # same GEMM, im2col matrix and product in cached buffers
+        rows = m * output_height * output_width
+        columns = workspace.buffer('im2col', (rows, kh * kw * c_prev),
+                                   accumulation)
+        columns.reshape(windows.shape)[...] = windows
+        convolved_images = workspace.buffer('product', (rows, c_new),
+                                            accumulation)
+        np.matmul(columns, W.reshape(-1, c_new), out=convolved_images)
+        convolved_images = convolved_images.reshape(output_shape)
+    else:
+        if workspace is not None:
+            convolved_images = workspace.buffer('product', output_shape,
+                                                accumulation)
+        else:
+            convolved_images = np.empty(output_shape, dtype=accumulation)
+        size = m if axis == 'm' else c_new
+        bounds = np.linspace(0, size,
+                             min(size, PARALLEL_CHUNKS) + 1).astype(int)
+        chunks = [slice(i, j) for i, j in zip(bounds[:-1], bounds[1:])]
 
-    # pad image
-    image_pad = np.pad(A_prev,
-                       ((0, 0), (ph, ph),
-                        (pw, pw), (0, 0)), mode='constant')
+        def convolve_chunk(chunk):
+            """ convolution of one chunk of the batch or of the kernels """
+            if axis == 'm':
+                convolved_images[chunk] = np.tensordot(windows[chunk], W,
+                                                       axes=3)
+            else:
+                convolved_images[..., chunk] = np.tensordot(
+                    windows, W[..., chunk], axes=3)
 
-    # convolution
-    for k in range(c_new):
-        for h in range(output_height):
-            for w in range(output_width):
-                # extract region from each image
-                image_zone = image_pad[:, h * sh:h * sh + kh,
-                                       w * sw:w * sw + kw, :]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(convolve_chunk, chunks))
 
-                # element wize multiplication
-                convolved_images[:, h, w, k] = np.sum(image_zone
-                                                      * W[:, :, :, k],
-                                                      axis=(1, 2, 3))
+    target = out
+    if workspace is not None and out is None:
+        # the product buffer is reused by the next call: do not return it
+        target = np.empty(output_shape, dtype=accumulation)
 
-    # add bias
-    Z = convolved_images + b
+    # add bias and apply activation function, fused in place if known
+    Z = cnn_engine.bias_activation(convolved_images, b, activation, target)
 
-    # apply activation function
-    Z = activation(Z)
+    if out is not None:
+        if Z is not out:
+            out[...] = Z
+        return out
 
-    return Z
+    return Z.astype(storage, copy=False)
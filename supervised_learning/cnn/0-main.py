@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+
+import time
+import numpy as np
+conv_forward = __import__('0-conv_forward').conv_forward
+
+np.random.seed(0)
+A_prev = np.random.randn(32, 56, 56, 64)
+W = np.random.randn(3, 3, 64, 64) * np.sqrt(2 / (9 * 64))
+b = np.random.randn(1, 1, 1, 64)
+
+
+def linear(Z):
+    """ identity activation """
+    return Z
+
+
+for algorithm in ['im2col', 'winograd']:
+    start = time.perf_counter()
+    Z = conv_forward(A_prev, W, b, linear, algorithm=algorithm)
+    print('{:8} {:7.1f} ms'.format(algorithm,
+                                   (time.perf_counter() - start) * 1000))
+    if algorithm == 'im2col':
+        reference = Z
+
+# Winograd only reorders float operations: its error stays at rounding
+# level relative to the magnitude of the outputs
+error = np.max(np.abs(Z - reference)) / np.max(np.abs(reference))
+print('max relative error {:.2e}'.format(error))
+assert error < 1e-12
@@ -4,9 +4,11 @@
 """
 
 import numpy as np
+cnn_engine = __import__('cnn_engine')
 
 
-def pool_forward(A_prev, kernel_shape, stride=(1, 1), mode='max'):
+def pool_forward(A_prev, kernel_shape, stride=(1, 1), mode='max',
+                 dtype=None, out=None, return_indices=False):
     """
         function that performs forward propagation over a pooling layer
         of a NN
@@ -15,8 +17,15 @@ def pool_forward(A_prev, kernel_shape, stride=(1, 1), mode='max'):
         :param kernel_shape: tuple(kh,kw), size kernel for pooling
         :param stride: tuple(sh, sw) stride for pooling
         :param mode: string 'max' or 'avg' type of pooling
+        :param dtype: None (float64), 'float32' or 'mixed' (float16
+        storage, float32 accumulation)
+        :param out: ndarray, shape(m,h_new,w_new,c_prev), written in place
+        if given
+        :param return_indices: bool, also return the int32 flat argmax
+        (row * kw + col) inside each window ('max' mode), which lets
+        pool_backward scatter gradients in O(output)
 
-        :return: output pooling layer
+        :return: output pooling layer, and the indices if return_indices
     """
     # size
     m, h_prev, w_prev, c_prev = A_prev.shape
@@ -27,18 +36,33 @@ def pool_forward(A_prev, kernel_shape, stride=(1, 1), mode='max'):
     output_height = int((h_prev - kh) / sh + 1)
     output_width = int((w_prev - kw) / sw + 1)
 
+    storage, accumulation = cnn_engine.resolve_dtype(dtype)
+    A_prev = np.asarray(A_prev, dtype=storage)
+
     # initialize output
-    pooled_img = np.zeros((m, output_height, output_width, c_prev))
-
-    # pooled
-    for i in range(output_height):
-        for j in range(output_width):
-            image_zone = A_prev[:, i * sh:i * sh + kh,
-                                j * sw:j * sw + kw, :]
-
-            if mode == 'max':
-                pooled_img[:, i, j, :] = np.max(image_zone, axis=(1, 2))
-            elif mode == 'avg':
-                pooled_img[:, i, j, :] = np.average(image_zone, axis=(1, 2))
+    if out is None:
+        pooled_img = np.zeros((m, output_height, output_width, c_prev),
+                              dtype=storage)
+    else:
+        pooled_img = out
+
+    # view of every window, shape(m, oh, ow, kh, kw, c_prev), no copy
+    windows = cnn_engine.sliding_windows(A_prev, (kh, kw), stride,
+                                         (output_height, output_width))
+
+    # pooled, straight into the output
+    if mode == 'max':
+        np.max(windows, axis=(3, 4), out=pooled_img)
+    elif mode == 'avg':
+        np.mean(windows, axis=(3, 4), dtype=accumulation, out=pooled_img)
+
+    if return_indices:
+        indices = None
+        if mode == 'max':
+            # flatten (kh, kw) to a single axis to get one index per window
+            flat = windows.reshape(m, output_height, output_width, kh * kw,
+                                   c_prev)
+            indices = np.argmax(flat, axis=3).astype(np.int32)
+        return pooled_img, indices
 
     return pooled_img
@@ -4,9 +4,11 @@
 """
 
 import numpy as np
+cnn_engine = __import__('cnn_engine')
 
 
-def conv_backward(dZ, A_prev, W, b, padding="same", stride=(1, 1)):
+def conv_backward(dZ, A_prev, W, b, padding="same", stride=(1, 1),
+                  dtype=None):
     """
         function that performs back propagation over a convolutional
         layer of NN
@@ -20,6 +22,8 @@ def conv_backward(dZ, A_prev, W, b, padding="same", stride=(1, 1)):
         :param b: ndarray, shape(1,1,1,c_new) biases
         :param padding: string 'same' or 'valid' type of padding
         :param stride: tuple (sh,sw) stride of convolution
+        :param dtype: None (float64), 'float32' or 'mixed' (float16
+        storage, float32 accumulation)
 
         :return: the partial derivatives with respect to the previous
     layer (dA_prev),the kernels (dW), and the biases (db), respectively
@@ -27,7 +31,7 @@ def conv_backward(dZ, A_prev, W, b, padding="same", stride=(1, 1)):
 
     # extract variable
     _, h_new, w_new, c_new = dZ.shape
-    m, h_prev, w_prev, c_prev = A_prev.shape
+    _, h_prev, w_prev, _ = A_prev.shape
     kh, kw, _, _ = W.shape
     sh, sw = stride
 
@@ -39,42 +43,36 @@ def conv_backward(dZ, A_prev, W, b, padding="same", stride=(1, 1)):
         ph = int((((h_prev - 1) * sh + kh - h_prev) / 2 + 0.5))
         pw = int((((w_prev - 1) * sw + kw - w_prev) / 2 + 0.5))
 
-    # apply padding
-    A_prev_pad = np.pad(A_prev,
+    storage, accumulation = cnn_engine.resolve_dtype(dtype)
+    dZ = np.asarray(dZ, dtype=accumulation)
+    W = np.asarray(W, dtype=accumulation)
+
+    # apply padding, in the storage precision
+    A_prev_pad = np.pad(np.asarray(A_prev, dtype=storage),
                         [(0, 0), (ph, ph), (pw, pw), (0, 0)],
                         mode='constant')
 
     # calcul of db
     db = np.sum(dZ, axis=(0, 1, 2), keepdims=True)
 
-    # initialize shape for dA_pad and dW
-    dA_pad = np.zeros(shape=A_prev_pad.shape)
-    dW = np.zeros(shape=W.shape)
-
-    # output
-    # for each example
-    for i in range(m):
-        for h in range(h_new):
-            for w in range(w_new):
-                # for each filter
-                for f in range(c_new):
-                    # define vertical/horizontal start and end
-                    v_start = h * sh
-                    v_end = v_start + kh
-                    h_start = w * sw
-                    h_end = h_start + kw
+    # dW: windows (m,h_new,w_new,kh,kw,c_prev) contracted with dZ over
+    # (m,h_new,w_new), one GEMM
+    windows = cnn_engine.sliding_windows(A_prev_pad, (kh, kw), stride,
+                                         (h_new, w_new))
+    dW = np.tensordot(windows, dZ, axes=([0, 1, 2], [0, 1, 2]))
 
-                    # update derivative
-                    dA_pad[i, v_start:v_end, h_start:h_end, :]\
-                        += W[:, :, :, f] * dZ[i, h, w, f]
-                    dW[:, :, :, f] += (A_prev_pad[i, v_start:v_end,
-                                                  h_start:h_end, :]
-                                       * dZ[i, h, w, f])
+    # dA: col2im, scatter-add of dZ @ W[i, j].T on the strided
+    # positions read by each kernel offset
+    dA_pad = np.zeros(shape=A_prev_pad.shape, dtype=accumulation)
+    span_h = (h_new - 1) * sh + 1
+    span_w = (w_new - 1) * sw + 1
+    for i in range(kh):
+        for j in range(kw):
+            dA_pad[:, i:i + span_h:sh, j:j + span_w:sw, :] \
+                += dZ @ W[i, j].T
 
     # maintain output size when same
-    if padding == "same":
-        dA = dA_pad[:, ph:-ph, pw:-pw, :]
-    else:
-        dA = dA_pad
+    dA = dA_pad[:, ph:ph + h_prev, pw:pw + w_prev, :]
 
-    return dA, dW, db
+    return (dA.astype(storage, copy=False), dW.astype(storage, copy=False),
+            db.astype(storage, copy=False))
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+import time
+import numpy as np
+conv_backward = __import__('2-conv_backward').conv_backward
+
+
+def conv_backward_loops(dZ, A_prev, W, padding="same", stride=(1, 1)):
+    """ previous implementation: four nested loops over m, h, w, c """
+    _, h_new, w_new, c_new = dZ.shape
+    m, h_prev, w_prev, _ = A_prev.shape
+    kh, kw, _, _ = W.shape
+    sh, sw = stride
+    ph, pw = 0, 0
+    if padding == 'same':
+        ph = int((((h_prev - 1) * sh + kh - h_prev) / 2 + 0.5))
+        pw = int((((w_prev - 1) * sw + kw - w_prev) / 2 + 0.5))
+    A_prev_pad = np.pad(A_prev, [(0, 0), (ph, ph), (pw, pw), (0, 0)])
+    db = np.sum(dZ, axis=(0, 1, 2), keepdims=True)
+    dA_pad = np.zeros(A_prev_pad.shape)
+    dW = np.zeros(W.shape)
+    for i in range(m):
+        for h in range(h_new):
+            for w in range(w_new):
+                for f in range(c_new):
+                    v, u = h * sh, w * sw
+                    dA_pad[i, v:v + kh, u:u + kw] += W[..., f] * dZ[i, h, w, f]
+                    dW[..., f] += A_prev_pad[i, v:v + kh, u:u + kw] \
+                        * dZ[i, h, w, f]
+    # cropped by size (the old [ph:-ph] slice is empty for ph = 0)
+    return dA_pad[:, ph:ph + h_prev, pw:pw + w_prev], dW, db
+
+
+np.random.seed(0)
+# kernel, padding, stride: overlapping (stride < kernel), disjoint and
+# gapped (stride > kernel) windows
+cases = [((3, 3), 'same', (1, 1)), ((5, 5), 'same', (1, 1)),
+         ((3, 3), 'valid', (1, 1)), ((3, 3), 'valid', (2, 2)),
+         ((2, 2), 'valid', (2, 2)), ((2, 3), 'valid', (3, 2))]
+for kernel, padding, stride in cases:
+    A_prev = np.random.randn(4, 11, 12, 3)
+    W = np.random.randn(*kernel, 3, 5)
+    b = np.random.randn(1, 1, 1, 5)
+    sh, sw = stride
+    h_new = (11 - kernel[0]) // sh + 1 if padding == 'valid' else 11
+    w_new = (12 - kernel[1]) // sw + 1 if padding == 'valid' else 12
+    dZ = np.random.randn(4, h_new, w_new, 5)
+
+    start = time.perf_counter()
+    expected = conv_backward_loops(dZ, A_prev, W, padding, stride)
+    loops = time.perf_counter() - start
+    start = time.perf_counter()
+    result = conv_backward(dZ, A_prev, W, b, padding, stride)
+    vectorized = time.perf_counter() - start
+
+    for name, r, e in zip(('dA', 'dW', 'db'), result, expected):
+        assert r.shape == e.shape, (name, r.shape, e.shape)
+        assert np.allclose(r, e, rtol=1e-12, atol=1e-12), name
+    print('{} {:5} {}: loops {:7.1f} ms, vectorized {:5.1f} ms'.format(
+        kernel, padding, stride, loops * 1000, vectorized * 1000))
+print('dA, dW and db match the loop implementation')
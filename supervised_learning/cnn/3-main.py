@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+import time
+import numpy as np
+pool_forward = __import__('1-pool_forward').pool_forward
+pool_backward = __import__('3-pool_backward').pool_backward
+
+
+def pool_backward_loops(dA, A_prev, kernel_shape, stride=(1, 1),
+                        mode='max'):
+    """ previous implementation: four nested loops over m, h, w, c """
+    m, h_new, w_new, c = dA.shape
+    kh, kw = kernel_shape
+    sh, sw = stride
+    dA_prev = np.zeros(A_prev.shape)
+    for i in range(m):
+        for h in range(h_new):
+            for w in range(w_new):
+                for f in range(c):
+                    v, u = h * sh, w * sw
+                    if mode == 'avg':
+                        dA_prev[i, v:v + kh, u:u + kw, f] += \
+                            dA[i, h, w, f] / kh / kw
+                    else:
+                        window = A_prev[i, v:v + kh, u:u + kw, f]
+                        # every tied maximum gets the gradient
+                        dA_prev[i, v:v + kh, u:u + kw, f] += \
+                            (window == np.max(window)) * dA[i, h, w, f]
+    return dA_prev
+
+
+np.random.seed(0)
+# overlapping (stride < kernel), disjoint and gapped (stride > kernel)
+# windows
+cases = [((2, 2), (2, 2)), ((3, 3), (1, 1)), ((3, 3), (2, 2)),
+         ((2, 3), (3, 1)), ((2, 2), (3, 3))]
+for kernel, stride in cases:
+    # small integers: most windows hold tied maxima
+    tied = np.random.randint(0, 3, (4, 13, 14, 3)).astype(float)
+    distinct = np.random.randn(4, 13, 14, 3)
+    for A_prev, ties in ((tied, True), (distinct, False)):
+        for mode in ('max', 'avg'):
+            A, indices = pool_forward(A_prev, kernel, stride, mode,
+                                      return_indices=True)
+            dA = np.random.randn(*A.shape)
+
+            start = time.perf_counter()
+            expected = pool_backward_loops(dA, A_prev, kernel, stride, mode)
+            loops = time.perf_counter() - start
+            start = time.perf_counter()
+            result = pool_backward(dA, A_prev, kernel, stride, mode)
+            vectorized = time.perf_counter() - start
+            assert result.shape == expected.shape
+            assert np.allclose(result, expected, rtol=1e-12, atol=1e-12), \
+                (kernel, stride, mode, ties)
+
+            if mode == 'max' and not ties:
+                # argmax indices route each gradient to a single position,
+                # the same one as the mask when the maximum is unique
+                routed = pool_backward(dA, A_prev, kernel, stride, mode,
+                                       indices=indices)
+                assert np.allclose(routed, expected, rtol=1e-12,
+                                   atol=1e-12), (kernel, stride)
+            print('{} {} {} {:8}: loops {:7.1f} ms, vectorized {:5.1f} ms'
+                  .format(kernel, stride, mode,
+                          'ties' if ties else 'distinct',
+                          loops * 1000, vectorized * 1000))
+print('dA_prev matches the loop implementation')
@@ -4,9 +4,11 @@
 """
 
 import numpy as np
+cnn_engine = __import__('cnn_engine')
 
 
-def pool_backward(dA, A_prev, kernel_shape, stride=(1, 1), mode='max'):
+def pool_backward(dA, A_prev, kernel_shape, stride=(1, 1), mode='max',
+                  dtype=None, indices=None):
     """
         function that performs back propagation over a pooling layer of NN
 
@@ -17,40 +19,62 @@ def pool_backward(dA, A_prev, kernel_shape, stride=(1, 1), mode='max'):
         :param kernel_shape: tuple(kh,kw) size kernel for pooling
         :param stride: tuple(sh,sw) stride for the pooling
         :param mode: string 'max' or 'avg' indicating mode of pooling
+        :param dtype: None (float64), 'float32' or 'mixed' (float16
+        storage, float32 accumulation)
+        :param indices: ndarray int, shape(m,h_new,w_new,c), flat argmax
+        (row * kw + col) inside each window, as returned by pool_forward
+        with return_indices=True: max gradients are then scattered in
+        O(output) to a single position per window
 
         :return: partial derivatives with respect to the previous layer
         (dA_prev)
     """
     # extract variable
     m, h_new, w_new, c = dA.shape
-    _, h_prev, w_prev, _ = A_prev.shape
     kh, kw = kernel_shape
     sh, sw = stride
+    span_h = (h_new - 1) * sh + 1
+    span_w = (w_new - 1) * sw + 1
+
+    storage, accumulation = cnn_engine.resolve_dtype(dtype)
+    dA = np.asarray(dA, dtype=accumulation)
 
     # initialize shape for dA_prev and dW
-    dA_prev = np.zeros(A_prev.shape)
-
-    for i in range(m):
-        for h in range(h_new):
-            for w in range(w_new):
-                for f in range(c):
-                    # define vertical/horizontal start and end
-                    v_start = h * sh
-                    v_end = v_start + kh
-                    h_start = w * sw
-                    h_end = h_start + kw
-
-                    if mode == 'avg':
-                        # mean of derivatives would be added to all
-                        # cells within the kernel grid in every moves
-                        avg_dA = dA[i, h, w, f] / kh / kw
-                        dA_prev[i, v_start:v_end, h_start:h_end, f] += (
-                                np.ones((kh, kw)) * avg_dA)
-                    elif mode == 'max':
-                        a_prev_slice \
-                            = A_prev[i, v_start:v_end, h_start:h_end, f]
-                        mask = (a_prev_slice == np.max(a_prev_slice))
-                        dA_prev[i, v_start:v_end, h_start:h_end, f] +=\
-                            mask * dA[i, h, w, f]
-
-    return dA_prev
+    dA_prev = np.zeros(A_prev.shape, dtype=accumulation)
+
+    if mode == 'avg':
+        # mean of derivatives would be added to all
+        # cells within the kernel grid in every moves
+        avg_dA = dA / kh / kw
+        for i in range(kh):
+            for j in range(kw):
+                dA_prev[:, i:i + span_h:sh, j:j + span_w:sw] += avg_dA
+
+    elif mode == 'max' and indices is not None:
+        # index-scatter: position of the max of each window
+        row = (np.arange(h_new) * sh)[:, np.newaxis, np.newaxis] \
+            + indices // kw
+        col = (np.arange(w_new) * sw)[np.newaxis, :, np.newaxis] \
+            + indices % kw
+        sample = np.arange(m)[:, np.newaxis, np.newaxis, np.newaxis]
+        channel = np.arange(c)
+        target = (sample, row, col, channel)
+        if sh >= kh and sw >= kw:
+            # windows do not overlap: no position is hit twice
+            dA_prev[target] = dA
+        else:
+            np.add.at(dA_prev, target, dA)
+
+    elif mode == 'max':
+        # every cell equal to the max of its window receives the
+        # derivative (ties included), one kernel offset at a time
+        A_prev = np.asarray(A_prev, dtype=storage)
+        windows = cnn_engine.sliding_windows(A_prev, (kh, kw), stride,
+                                             (h_new, w_new))
+        pooled = np.max(windows, axis=(3, 4))
+        for i in range(kh):
+            for j in range(kw):
+                mask = A_prev[:, i:i + span_h:sh, j:j + span_w:sw] == pooled
+                dA_prev[:, i:i + span_h:sh, j:j + span_w:sw] += mask * dA
+
+    return dA_prev.astype(storage, copy=False)
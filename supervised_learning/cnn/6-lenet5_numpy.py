@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""
+    LeNet-5 (NumPy)
+"""
+
+import numpy as np
+conv_forward = __import__('0-conv_forward').conv_forward
+pool_forward = __import__('1-pool_forward').pool_forward
+conv_backward = __import__('2-conv_backward').conv_backward
+pool_backward = __import__('3-pool_backward').pool_backward
+
+
+class Layer:
+    """
+        Class Layer : node of the graph, keeps what its backward pass
+        needs between forward and backward, then frees it
+
+        Layers only share this state; each one provides
+        forward(A_prev, training=False) and backward(dA), which consumes
+        and frees the cache
+    """
+
+    def __init__(self):
+        """
+            class constructor
+        """
+        self.params = {}
+        self.grads = {}
+        self.cache = None
+
+
+def activate(Z, activation):
+    """
+        function that applies an activation and keeps a compact record
+        of what its derivative needs
+
+        :param Z: ndarray, unactivated output
+        :param activation: 'relu', 'tanh' or 'linear'
+
+        :return: tuple (A, record): a bool mask for relu (1 byte per
+        value), A for tanh, None for linear
+    """
+    if activation == 'relu':
+        mask = Z > 0
+        return Z * mask, mask
+    if activation == 'tanh':
+        A = np.tanh(Z)
+        return A, A
+    return Z, None
+
+
+def activate_backward(dA, activation, record):
+    """
+        function that propagates through an activation
+
+        :param dA: ndarray, derivative with respect to the activation
+        :param activation: 'relu', 'tanh' or 'linear'
+        :param record: what activate returned for the derivative
+
+        :return: derivative with respect to the unactivated output
+    """
+    if activation == 'relu':
+        return dA * record
+    if activation == 'tanh':
+        return dA * (1 - record ** 2)
+    return dA
+
+
+class Conv(Layer):
+    """
+        Class Conv : convolutional layer over conv_forward / conv_backward
+    """
+
+    def __init__(self, kernel_shape, c_prev, c_new, activation='relu',
+                 padding='same', stride=(1, 1)):
+        """
+            class constructor, He normal initialization
+
+            :param kernel_shape: tuple(kh,kw)
+            :param c_prev: int, input channels
+            :param c_new: int, number of kernels
+            :param activation: 'relu', 'tanh' or 'linear'
+            :param padding: 'same' or 'valid'
+            :param stride: tuple(sh,sw)
+        """
+        super().__init__()
+        kh, kw = kernel_shape
+        std = np.sqrt(2 / (kh * kw * c_prev))
+        self.params['W'] = np.random.randn(kh, kw, c_prev, c_new) * std
+        self.params['b'] = np.zeros((1, 1, 1, c_new))
+        self.activation = activation
+        self.padding = padding
+        self.stride = stride
+
+    def forward(self, A_prev, training=False):
+        """
+            forward propagation of the layer
+
+            :param A_prev: ndarray, shape(m,h_prev,w_prev,c_prev)
+            :param training: bool, cache what backward needs
+
+            :return: ndarray, shape(m,h_new,w_new,c_new)
+        """
+        # bias and activation fused in place by conv_forward
+        A = conv_forward(A_prev, self.params['W'], self.params['b'],
+                         self.activation, self.padding, self.stride)
+        record = None
+        if self.activation == 'relu':
+            record = A > 0
+        elif self.activation == 'tanh':
+            record = A
+        if training:
+            self.cache = (A_prev, record)
+        return A
+
+    def backward(self, dA):
+        """
+            back propagation of the layer, consumes and frees the cache
+
+            :param dA: ndarray, shape(m,h_new,w_new,c_new)
+
+            :return: ndarray, shape(m,h_prev,w_prev,c_prev)
+        """
+        A_prev, record = self.cache
+        self.cache = None
+        dZ = activate_backward(dA, self.activation, record)
+        dA_prev, self.grads['W'], self.grads['b'] = conv_backward(
+            dZ, A_prev, self.params['W'], self.params['b'], self.padding,
+            self.stride)
+        return dA_prev
+
+
+class Pool(Layer):
+    """
+        Class Pool : pooling layer over pool_forward / pool_backward
+    """
+
+    def __init__(self, kernel_shape=(2, 2), stride=(2, 2), mode='max'):
+        """
+            class constructor
+
+            :param kernel_shape: tuple(kh,kw)
+            :param stride: tuple(sh,sw)
+            :param mode: 'max' or 'avg'
+        """
+        super().__init__()
+        self.kernel_shape = kernel_shape
+        self.stride = stride
+        self.mode = mode
+
+    def forward(self, A_prev, training=False):
+        """
+            forward propagation of the layer
+
+            :param A_prev: ndarray, shape(m,h_prev,w_prev,c)
+            :param training: bool, cache what backward needs
+
+            :return: ndarray, shape(m,h_new,w_new,c)
+        """
+        A, indices = pool_forward(A_prev, self.kernel_shape, self.stride,
+                                  self.mode, return_indices=True)
+        if training:
+            # int32 argmax instead of the input: backward only needs
+            # the shape of A_prev
+            self.cache = (A_prev.shape, indices)
+        return A
+
+    def backward(self, dA):
+        """
+            back propagation of the layer, consumes and frees the cache
+
+            :param dA: ndarray, shape(m,h_new,w_new,c)
+
+            :return: ndarray, shape(m,h_prev,w_prev,c)
+        """
+        shape, indices = self.cache
+        self.cache = None
+        # zero-stride stand-in for A_prev, no memory
+        A_prev = np.broadcast_to(np.zeros(1), shape)
+        return pool_backward(dA, A_prev, self.kernel_shape, self.stride,
+                             self.mode, indices=indices)
+
+
+class Flatten(Layer):
+    """
+        Class Flatten : reshapes (m,h,w,c) to (m,h*w*c)
+    """
+
+    def forward(self, A_prev, training=False):
+        """
+            forward propagation of the layer
+
+            :param A_prev: ndarray, shape(m,h,w,c)
+            :param training: bool, cache what backward needs
+
+            :return: ndarray, shape(m,h*w*c)
+        """
+        if training:
+            self.cache = A_prev.shape
+        return A_prev.reshape(A_prev.shape[0], -1)
+
+    def backward(self, dA):
+        """
+            back propagation of the layer, consumes and frees the cache
+
+            :param dA: ndarray, shape(m,h*w*c)
+
+            :return: ndarray, shape(m,h,w,c)
+        """
+        shape = self.cache
+        self.cache = None
+        return dA.reshape(shape)
+
+
+class Dense(Layer):
+    """
+        Class Dense : fully connected layer
+    """
+
+    def __init__(self, nx, nodes, activation='relu'):
+        """
+            class constructor, He normal initialization
+
+            :param nx: int, input features
+            :param nodes: int, output features
+            :param activation: 'relu', 'tanh' or 'linear'
+        """
+        super().__init__()
+        self.params['W'] = np.random.randn(nx, nodes) * np.sqrt(2 / nx)
+        self.params['b'] = np.zeros((1, nodes))
+        self.activation = activation
+
+    def forward(self, A_prev, training=False):
+        """
+            forward propagation of the layer
+
+            :param A_prev: ndarray, shape(m,nx)
+            :param training: bool, cache what backward needs
+
+            :return: ndarray, shape(m,nodes)
+        """
+        Z = A_prev @ self.params['W'] + self.params['b']
+        A, record = activate(Z, self.activation)
+        if training:
+            self.cache = (A_prev, record)
+        return A
+
+    def backward(self, dA):
+        """
+            back propagation of the layer, consumes and frees the cache
+
+            :param dA: ndarray, shape(m,nodes)
+
+            :return: ndarray, shape(m,nx)
+        """
+        A_prev, record = self.cache
+        self.cache = None
+        dZ = activate_backward(dA, self.activation, record)
+        self.grads['W'] = A_prev.T @ dZ
+        self.grads['b'] = np.sum(dZ, axis=0, keepdims=True)
+        return dZ @ self.params['W'].T
+
+
+class Adam:
+    """
+        Class Adam : Adam optimization of the layer parameters
+    """
+
+    def __init__(self, alpha=0.001, beta1=0.9, beta2=0.999, epsilon=1e-7):
+        """
+            class constructor
+
+            :param alpha: learning rate
+            :param beta1: weight of the first moment
+            :param beta2: weight of the second moment
+            :param epsilon: small number to avoid division by zero
+        """
+        self.alpha = alpha
+        self.beta1 = beta1
+        self.beta2 = beta2
+        self.epsilon = epsilon
+        self.t = 0
+        self.moments = {}
+
+    def step(self, layer):
+        """
+            updates the parameters of a layer with its gradients, then
+            frees the gradients
+
+            :param layer: Layer whose grads were just computed
+        """
+        for name, grad in layer.grads.items():
+            key = (id(layer), name)
+            v, s = self.moments.get(key, (0, 0))
+            v = self.beta1 * v + (1 - self.beta1) * grad
+            s = self.beta2 * s + (1 - self.beta2) * grad ** 2
+            self.moments[key] = (v, s)
+            v_corrected = v / (1 - self.beta1 ** self.t)
+            s_corrected = s / (1 - self.beta2 ** self.t)
+            layer.params[name] -= (self.alpha * v_corrected
+                                   / (np.sqrt(s_corrected) + self.epsilon))
+        layer.grads = {}
+
+
+class Sequential:
+    """
+        Class Sequential : chain of layers trained with softmax
+        cross-entropy
+    """
+
+    def __init__(self, layers, optimizer=None):
+        """
+            class constructor
+
+            :param layers: list of Layer
+            :param optimizer: Adam, default Adam()
+        """
+        self.layers = layers
+        self.optimizer = optimizer or Adam()
+
+    def forward(self, X, training=False):
+        """
+            forward propagation of the network
+
+            :param X: ndarray, input of the first layer
+            :param training: bool, cache what backward needs
+
+            :return: ndarray, shape(m,classes), softmax probabilities
+        """
+        A = X
+        for layer in self.layers:
+            A = layer.forward(A, training)
+
+        # stable softmax
+        e = np.exp(A - np.max(A, axis=1, keepdims=True))
+        return e / np.sum(e, axis=1, keepdims=True)
+
+    def backward(self, Y_hat, Y):
+        """
+            back propagation of the network: each layer is updated as
+            soon as its gradients exist, and its cache and gradients are
+            freed before the next layer is processed
+
+            :param Y_hat: ndarray, shape(m,classes), softmax output
+            :param Y: ndarray, shape(m,classes), one-hot labels
+        """
+        self.optimizer.t += 1
+        # softmax + cross-entropy derivative, averaged over the batch
+        dA = (Y_hat - Y) / Y.shape[0]
+        for layer in reversed(self.layers):
+            dA = layer.backward(dA)
+            self.optimizer.step(layer)
+
+    def train_step(self, X, Y):
+        """
+            one forward and backward pass on a mini-batch
+
+            :param X: ndarray, input mini-batch
+            :param Y: ndarray, one-hot labels
+
+            :return: float, cross-entropy cost of the mini-batch
+        """
+        Y_hat = self.forward(X, training=True)
+        cost = -np.sum(Y * np.log(Y_hat + 1e-12)) / Y.shape[0]
+        self.backward(Y_hat, Y)
+        return cost
+
+    def fit(self, X, Y, epochs=5, batch_size=32, shuffle=True,
+            verbose=True):
+        """
+            trains the network with mini-batches
+
+            :param X: ndarray, inputs
+            :param Y: ndarray, one-hot labels
+            :param epochs: int, passes over the data
+            :param batch_size: int, size of the mini-batches
+            :param shuffle: bool, shuffle the data every epoch
+            :param verbose: bool, print the cost every epoch
+
+            :return: list of the mean cost of each epoch
+        """
+        m = X.shape[0]
+        history = []
+        for epoch in range(epochs):
+            order = np.random.permutation(m) if shuffle else np.arange(m)
+            costs = []
+            for start in range(0, m, batch_size):
+                batch = order[start:start + batch_size]
+                costs.append(self.train_step(X[batch], Y[batch]))
+            history.append(float(np.mean(costs)))
+            if verbose:
+                print("Epoch {}: cost {}".format(epoch + 1, history[-1]))
+        return history
+
+    def predict(self, X, batch_size=256):
+        """
+            predicts class probabilities, without caching anything
+
+            :param X: ndarray, inputs
+            :param batch_size: int, size of the inference batches
+
+            :return: ndarray, shape(m,classes)
+        """
+        return np.concatenate([self.forward(X[i:i + batch_size])
+                               for i in range(0, X.shape[0], batch_size)])
+
+    def evaluate(self, X, Y):
+        """
+            accuracy of the network
+
+            :param X: ndarray, inputs
+            :param Y: ndarray, one-hot labels
+
+            :return: float, accuracy
+        """
+        return float(np.mean(np.argmax(self.predict(X), axis=1)
+                             == np.argmax(Y, axis=1)))
+
+
+def lenet5(input_shape=(28, 28, 1), classes=10, alpha=0.001):
+    """
+        function that builds the modified LeNet-5 of 5-lenet5.py with
+        the NumPy layers, trainable without TensorFlow
+
+        :param input_shape: tuple(h,w,c) of the images
+        :param classes: int, number of classes
+        :param alpha: learning rate of Adam
+
+        :return: Sequential model
+    """
+    h, w, c = input_shape
+    # 5x5 'same' conv, 2x2 pool, 5x5 'valid' conv, 2x2 pool
+    h2, w2 = (h // 2 - 4) // 2, (w // 2 - 4) // 2
+
+    return Sequential([
+        Conv((5, 5), c, 6, 'relu', padding='same'),
+        Pool((2, 2), (2, 2)),
+        Conv((5, 5), 6, 16, 'relu', padding='valid'),
+        Pool((2, 2), (2, 2)),
+        Flatten(),
+        Dense(h2 * w2 * 16, 120, 'relu'),
+        Dense(120, 84, 'relu'),
+        Dense(84, classes, 'linear'),
+    ], Adam(alpha))
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+    Helpers shared by the convolutional layers
+"""
+
+import numpy as np
+
+# resolve_dtype, sliding_windows and Workspace have a twin in
+# math/convolutions_and_pooling/convolve_engine.py: every project is
+# self-contained, keep both in step
+
+
+def resolve_dtype(dtype=None):
+    """
+        function that resolves a precision policy
+
+        :param dtype: None (float64), 'float32', 'float16' or 'mixed'
+        (float16 storage, float32 accumulation), or a numpy float dtype
+
+        :return: tuple (storage dtype, accumulation dtype)
+    """
+    if dtype is None:
+        dtype = np.float64
+    elif isinstance(dtype, str) and dtype == 'mixed':
+        dtype = np.float16
+    storage = np.dtype(dtype)
+
+    # never accumulate below float32
+    return storage, np.promote_types(storage, np.float32)
+
+
+def sliding_windows(A_pad, kernel_shape, stride, output_shape):
+    """
+        function that builds a read-only view of every kernel window
+
+        :param A_pad: ndarray, shape(m,h,w,c) padded layer input
+        :param kernel_shape: tuple(kh,kw)
+        :param stride: tuple(sh,sw)
+        :param output_shape: tuple(h_new,w_new)
+
+        :return: ndarray view, shape(m,h_new,w_new,kh,kw,c)
+    """
+    m, _, _, c = A_pad.shape
+    kh, kw = kernel_shape
+    sh, sw = stride
+    h_new, w_new = output_shape
+    s_m, s_h, s_w, s_c = A_pad.strides
+
+    # no copy: each window shares memory with A_pad
+    return np.lib.stride_tricks.as_strided(
+        A_pad,
+        shape=(m, h_new, w_new, kh, kw, c),
+        strides=(s_m, s_h * sh, s_w * sw, s_h, s_w, s_c),
+        writeable=False)
+
+
+class Workspace:
+    """
+        Class Workspace : scratch buffers reused across calls, keyed by
+        name, shape and dtype (not thread-safe, use one per thread)
+    """
+
+    def __init__(self):
+        """
+            class constructor
+        """
+        self.buffers = {}
+
+    def buffer(self, name, shape, dtype=np.float64):
+        """
+            function that returns a cached buffer, zero-filled on creation
+
+            :param name: str, role of the buffer
+            :param shape: tuple, shape of the buffer
+            :param dtype: dtype of the buffer
+
+            :return: ndarray
+        """
+        key = (name, tuple(shape), np.dtype(dtype).str)
+        if key not in self.buffers:
+            self.buffers[key] = np.zeros(shape, dtype=dtype)
+        return self.buffers[key]
+
+    def padded(self, A, ph, pw, dtype=np.float64):
+        """
+            function that copies A into a cached zero-bordered buffer,
+            replacing np.pad
+
+            :param A: ndarray, shape(m,h,w,c) layer input
+            :param ph: int, padding height
+            :param pw: int, padding width
+            :param dtype: dtype of the buffer
+
+            :return: ndarray, shape(m,h+2*ph,w+2*pw,c)
+        """
+        m, h, w, c = A.shape
+        A_pad = self.buffer('pad', (m, h + 2 * ph, w + 2 * pw, c), dtype)
+
+        # the border is zeroed on creation and never written
+        A_pad[:, ph:ph + h, pw:pw + w] = A
+
+        return A_pad
+
+    def clear(self):
+        """
+            function that releases every buffer
+        """
+        self.buffers.clear()
+
+
+def _sigmoid_(Z):
+    """
+        function that applies the sigmoid in place
+
+        :param Z: ndarray, overwritten
+
+        :return: Z
+    """
+    np.negative(Z, out=Z)
+    np.exp(Z, out=Z)
+    Z += 1
+    return np.reciprocal(Z, out=Z)
+
+
+# in-place activations of the fused conv_forward epilogue
+FUSED_ACTIVATIONS = {
+    'linear': lambda Z: Z,
+    'relu': lambda Z: np.maximum(Z, 0, out=Z),
+    'tanh': lambda Z: np.tanh(Z, out=Z),
+    'sigmoid': _sigmoid_,
+}
+
+
+def fused_activation(activation):
+    """
+        function that finds the in-place version of an activation
+
+        :param activation: name in FUSED_ACTIVATIONS, np.tanh, None
+        (linear) or any callable
+
+        :return: in-place function, or None for an arbitrary callable
+    """
+    if activation is None:
+        activation = 'linear'
+    elif activation is np.tanh:
+        activation = 'tanh'
+    if isinstance(activation, str):
+        if activation not in FUSED_ACTIVATIONS:
+            raise ValueError("unknown activation {}".format(activation))
+        return FUSED_ACTIVATIONS[activation]
+    return None
+
+
+def bias_activation(Z, b, activation, out=None):
+    """
+        function that adds the bias and applies the activation, in place
+        when the activation is known
+
+        :param Z: ndarray, shape(m,h,w,c) GEMM output, overwritten unless
+        out is given
+        :param b: ndarray, shape(1,1,1,c) biases
+        :param activation: see fused_activation
+        :param out: ndarray, shape(m,h,w,c) receiving the result
+
+        :return: ndarray, activated output (out, Z or a new array)
+    """
+    inplace = fused_activation(activation)
+    if inplace is None:
+        # arbitrary callable: bias and activation allocate
+        return activation(Z + np.asarray(b, dtype=Z.dtype))
+
+    if out is None or out.dtype != Z.dtype:
+        out = Z
+    np.add(Z, np.asarray(b, dtype=Z.dtype), out=out)
+    return inplace(out)
+
+
+# Winograd F(2x2, 3x3) kernel transform; the input (B^T) and output
+# (A^T) transforms only hold 0 and +-1 and are written as additions.
+# 16 multiplications per 2x2 output tile and channel pair instead of 36
+WINOGRAD_G = np.array([[1, 0, 0],
+                       [0.5, 0.5, 0.5],
+                       [0.5, -0.5, 0.5],
+                       [0, 0, 1]])
+
+
+def _winograd_input(d0, d1, d2, d3):
+    """
+        function that applies B^T along one axis of the 4x4 input tiles
+
+        :param d0: ndarray, first row (or column) of every tile
+        :param d1: ndarray, second row (or column) of every tile
+        :param d2: ndarray, third row (or column) of every tile
+        :param d3: ndarray, fourth row (or column) of every tile
+
+        :return: list of the 4 transformed rows (or columns)
+    """
+    return [d0 - d2, d1 + d2, d2 - d1, d1 - d3]
+
+
+def _winograd_output(m0, m1, m2, m3):
+    """
+        function that applies A^T along one axis of the 4x4 products
+
+        :param m0: ndarray, first row (or column) of every product
+        :param m1: ndarray, second row (or column) of every product
+        :param m2: ndarray, third row (or column) of every product
+        :param m3: ndarray, fourth row (or column) of every product
+
+        :return: list of the 2 output rows (or columns)
+    """
+    return [m0 + m1 + m2, m1 - m2 - m3]
+
+
+def winograd_conv3x3(A_pad, W, output_shape, dtype=np.float64):
+    """
+        function that performs a stride 1 convolution with 3x3 kernels
+        using Winograd minimal filtering F(2x2, 3x3)
+
+        :param A_pad: ndarray, shape(m,h,w,c_prev) padded layer input
+        :param W: ndarray, shape(3,3,c_prev,c_new) kernels
+        :param output_shape: tuple(h_new,w_new)
+        :param dtype: dtype of the transforms and products
+
+        :return: ndarray, shape(m,h_new,w_new,c_new)
+    """
+    m, _, _, c_prev = A_pad.shape
+    c_new = W.shape[3]
+    h_new, w_new = output_shape
+
+    # 2x2 output tiles, reading 4x4 input tiles overlapping by 2
+    th, tw = -(-h_new // 2), -(-w_new // 2)
+    extra_h = max(2 * th + 2 - A_pad.shape[1], 0)
+    extra_w = max(2 * tw + 2 - A_pad.shape[2], 0)
+    A_pad = np.asarray(A_pad, dtype=dtype)
+    if extra_h or extra_w:
+        A_pad = np.pad(A_pad, ((0, 0), (0, extra_h), (0, extra_w), (0, 0)))
+
+    # kernel transform U = G g G^T, shape(4,4,c_prev,c_new)
+    G = WINOGRAD_G.astype(dtype)
+    U = np.einsum('ai,ijck,bj->abck', G, np.asarray(W, dtype=dtype), G)
+
+    # input transform V = B^T d B on strided slices (no tile copies),
+    # shape(16,m*th*tw,c_prev)
+    rows = _winograd_input(*[A_pad[:, i:i + 2 * th:2] for i in range(4)])
+    V = np.empty((4, 4, m, th, tw, c_prev), dtype=dtype)
+    for a, row in enumerate(rows):
+        V[a] = _winograd_input(*[row[:, :, j:j + 2 * tw:2]
+                                 for j in range(4)])
+    V = V.reshape(4, 4, m * th * tw, c_prev)
+
+    # element-wise product summed over channels: 16 GEMMs
+    M = np.matmul(V, U)
+
+    # output transform Y = A^T M A, written into the 2x2 tile positions
+    Y = np.empty((m, th, 2, tw, 2, c_new), dtype=dtype)
+    for p, row in enumerate(_winograd_output(*M)):
+        for q, value in enumerate(_winograd_output(*row)):
+            Y[:, :, p, :, q] = value.reshape(m, th, tw, c_new)
+    Y = Y.reshape(m, 2 * th, 2 * tw, c_new)
+
+    return Y[:, :h_new, :w_new]